@@ -0,0 +1,113 @@
+import hashlib
+import json
+import os
+import sys
+import threading
+
+from service_ir import BookletIR
+
+# Modules whose code shapes a booklet: editing any of them invalidates every entry
+CODE_MODULES = ("ruthenian_engine", "service_ir", "rule_compiler", "resolution_session",
+                "liturgical_calendar", "dependencies", "text_store")
+
+
+def _sha256(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def code_digest(module_names=CODE_MODULES):
+    """sha256 over the source files of the loaded engine modules."""
+    h = hashlib.sha256()
+    for name in module_names:
+        path = getattr(sys.modules.get(name), "__file__", None)
+        if path and os.path.exists(path):
+            with open(path, "rb") as f:
+                h.update(f.read())
+    return h.hexdigest()
+
+
+class BookletCache:
+    """
+    Content-addressed on-disk cache of RuthenianEngine.render_day() results.
+
+    A day key hashes the base context, text layers and temple date; <day key>.deps.json
+    lists the json_db inputs (logic file sections, structures, text keys) the day read
+    when it was last rendered. An entry is stored under the hash of the day key plus the
+    content hashes of exactly those inputs, so a lookup hits only while none of them has
+    changed, and an unrelated edit leaves it valid.
+    """
+
+    FORMAT = 2
+
+    def __init__(self, path):
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._code = None
+        os.makedirs(path, exist_ok=True)
+
+    def day_key(self, engine, target_date, services=None):
+        if self._code is None:
+            self._code = code_digest(CODE_MODULES + (type(engine).__module__,))
+        key = {
+            "format": self.FORMAT,
+            "code": self._code,
+            "context": engine.get_liturgical_context(target_date),
+            "version_id": engine.version_id,
+            "texts": engine.text_db.describe(),
+            "temple_feast_date": engine.temple_feast_date,
+            "services": sorted(s.lower() for s in services) if services else None,
+        }
+        return _sha256(json.dumps(key, sort_keys=True, default=str))
+
+    def entry_key(self, day_key, digests):
+        items = sorted(json.dumps([list(dep), digest]) for dep, digest in digests.items())
+        return _sha256(day_key + "\n" + "\n".join(items))
+
+    def get(self, engine, target_date, services=None):
+        """The cached render_day() result, or None if absent or any recorded input changed."""
+        day_key = self.day_key(engine, target_date, services)
+        manifest = self._read(f"{day_key}.deps.json")
+        entry = None
+        if manifest is not None:
+            digests = engine.dependency_digests(tuple(dep) for dep in manifest["dependencies"])
+            entry = self._read(f"{self.entry_key(day_key, digests)}.json")
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return {"date": target_date, "context": entry["context"], "rubrics": entry["rubrics"],
+                "booklet": entry["booklet"], "ir": BookletIR.from_dict(entry["ir"]), "dependencies": digests}
+
+    def put(self, engine, target_date, services, result):
+        """Stores a render_day() result under its dependencies' current content hashes."""
+        day_key = self.day_key(engine, target_date, services)
+        digests = result["dependencies"]
+        self._write(f"{self.entry_key(day_key, digests)}.json", {
+            "date": target_date.isoformat(), "context": result["context"], "rubrics": result["rubrics"],
+            "booklet": result["booklet"], "ir": result["ir"].to_dict(),
+        })
+        self._write(f"{day_key}.deps.json", {"dependencies": sorted((list(dep) for dep in digests), key=json.dumps)})
+
+    def clear(self):
+        """Removes every cached file. Returns the number removed."""
+        count = 0
+        for name in os.listdir(self.path):
+            if name.endswith(".json"):
+                os.remove(os.path.join(self.path, name))
+                count += 1
+        return count
+
+    def _read(self, name):
+        try:
+            with open(os.path.join(self.path, name), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write(self, name, data):
+        path = os.path.join(self.path, name)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, default=str)
+        os.replace(tmp_path, path)
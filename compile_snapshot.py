@@ -0,0 +1,24 @@
+import argparse
+import time
+from ruthenian_engine import RuthenianEngine
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile the json_db layer into a binary engine snapshot")
+    parser.add_argument("--base-dir", type=str, default=".", help="Repository root containing json_db/")
+    parser.add_argument("--version", type=str, action="append", help="Recension Version ID (repeatable). Default: stamford_2014")
+    args = parser.parse_args()
+
+    print("=== RUTHENIAN ENGINE SNAPSHOT COMPILER ===")
+    for version in args.version or ["stamford_2014"]:
+        # Always parse the JSON sources, never an existing snapshot
+        engine = RuthenianEngine(base_dir=args.base_dir, version=version, use_snapshot=False)
+        path = engine.compile_snapshot()
+
+        start = time.perf_counter()
+        RuthenianEngine(base_dir=args.base_dir, version=version)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        print(f"[OK] {version} -> {path} (warm start: {elapsed_ms:.1f} ms)")
+
+if __name__ == "__main__":
+    main()
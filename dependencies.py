@@ -0,0 +1,66 @@
+"""
+Records which json_db inputs a resolution reads, for the content-addressed booklet
+cache (booklet_cache.py).
+
+A dependency is a tuple:
+    ("file", name, section)    a json_db logic file (section None = the whole file, else e.g. "days/15")
+    ("structure", file, root)  a flattened service structure
+    ("text", key)              a text_db entry
+RuthenianEngine.dependency_digests() turns a set of them into {dependency: content hash}.
+
+Recording is scoped with recording(deps); worker threads join the recording of the
+thread that submitted them through in_current_context().
+"""
+import contextvars
+from contextlib import contextmanager
+
+_recording = contextvars.ContextVar("dependency_recording", default=None)
+
+
+def record(dependency):
+    """Adds dependency to the active recording, if any."""
+    deps = _recording.get()
+    if deps is not None:
+        deps.add(dependency)
+
+
+@contextmanager
+def recording(deps):
+    """Records every dependency read inside the block into the set deps."""
+    token = _recording.set(deps)
+    try:
+        yield deps
+    finally:
+        _recording.reset(token)
+
+
+def in_current_context(func):
+    """Wraps func to run in a copy of the caller's context (and so its recording), e.g. on a pool thread."""
+    context = contextvars.copy_context()
+    return lambda *args: context.run(func, *args)
+
+
+class SourceAttribute:
+    """
+    Engine attribute holding parsed json_db file(s): reading it while a recording is
+    active records ("file", name, None) for each of its files. The value lives in the
+    instance __dict__ under the same name.
+    """
+
+    def __init__(self, name, *filenames):
+        self.name = name
+        self.dependencies = tuple(("file", filename, None) for filename in filenames)
+
+    def __get__(self, obj, owner=None):
+        if obj is None:
+            return self
+        deps = _recording.get()
+        if deps is not None:
+            deps.update(self.dependencies)
+        try:
+            return obj.__dict__[self.name]
+        except KeyError:
+            raise AttributeError(self.name) from None
+
+    def __set__(self, obj, value):
+        obj.__dict__[self.name] = value
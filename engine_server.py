@@ -0,0 +1,382 @@
+"""
+Local HTTP service mode: loaded RuthenianEngines kept warm behind an asyncio front end.
+
+    python engine_server.py --port 8080 [--workers 4] [--version stamford]
+
+    GET /context/2025-04-20
+    GET /rubrics/2025-04-20
+    GET /booklet/2025-04-20?service=matins&role=cantor&format=text
+    GET /health
+
+Resolution runs on an EnginePool: worker processes forked from the loaded engine
+(threads sharing it where fork is unavailable), so the event loop only parses requests
+and writes responses, and concurrent requests resolve in parallel. Stdlib only, offline.
+
+Rendered booklets are kept in a ResponseCache (LRU, bounded in bytes), and a background
+prefetcher keeps the next PREFETCH_DAYS days and the next Great Feast warm, so requests
+for the hot dates are answered without any resolution work.
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from ruthenian_engine import RuthenianEngine
+from service_ir import RENDERERS, ROLE_VIEWS
+
+CONTENT_TYPES = {"text": "text/plain; charset=utf-8", "cantor": "text/plain; charset=utf-8",
+                 "markdown": "text/markdown; charset=utf-8", "json": "application/json"}
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           500: "Internal Server Error"}
+
+
+# --- Jobs (run on the pool; engine is the worker's warm engine) ---
+
+def context_job(engine, target_date):
+    return engine.get_liturgical_context(target_date)
+
+
+def rubrics_job(engine, target_date):
+    context = engine.get_liturgical_context(target_date)
+    rubrics = engine.resolve_rubrics(context)
+    return {"context": context, "rubrics": rubrics}
+
+
+def booklet_job(engine, target_date, services=None, role=None, fmt="text"):
+    booklet_ir = engine.render_day(target_date, services)["ir"]
+    return engine.render_service_ir(booklet_ir.for_role(role), fmt)
+
+
+# Engine of a forked pool worker (inherited from the parent, never pickled)
+_WORKER_ENGINE = None
+
+def _init_worker(engine):
+    global _WORKER_ENGINE
+    _WORKER_ENGINE = engine
+
+def _run_in_worker(job, *args):
+    return job(_WORKER_ENGINE, *args)
+
+
+class EnginePool:
+    """
+    Runs jobs against a loaded engine off the event loop.
+    mode "process": workers forked from engine (default where fork exists); "thread": threads sharing it.
+    """
+
+    def __init__(self, engine, workers=None, mode=None):
+        self.engine = engine
+        self.workers = workers or os.cpu_count() or 1
+        if mode is None:
+            mode = "process" if "fork" in multiprocessing.get_all_start_methods() else "thread"
+        self.mode = mode
+        if mode == "process":
+            self.executor = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("fork"),
+                                                initializer=_init_worker, initargs=(engine,))
+            # Fork every worker now, from this thread, before the server starts its own
+            self.executor.submit(int).result()
+        else:
+            self.executor = ThreadPoolExecutor(self.workers)
+
+    def run(self, job, *args):
+        """Submits job(engine, *args); returns an awaitable for its result."""
+        loop = asyncio.get_running_loop()
+        if self.mode == "process":
+            return loop.run_in_executor(self.executor, _run_in_worker, job, *args)
+        return loop.run_in_executor(self.executor, job, self.engine, *args)
+
+    def shutdown(self):
+        self.executor.shutdown(wait=True)
+
+
+class ResponseCache:
+    """
+    In-process LRU of rendered responses, bounded by the total size of their bodies.
+    Keys are (date, recension, temple, role, format, services).
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            body = self._entries.get(key)
+            if body is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return body
+
+    def put(self, key, body):
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.size -= len(old)
+            if len(body) > self.max_bytes:
+                return
+            self._entries[key] = body
+            self.size += len(body)
+            while self.size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class EngineServer:
+    """
+    Minimal asyncio HTTP/1.1 server (one request per connection) over an EnginePool.
+    serve_in_background() runs it on its own thread and event loop, e.g. for tests or embedding.
+    """
+
+    PREFETCH_DAYS = 14
+    # (role, format) variants the prefetcher renders for every hot date
+    PREFETCH_VARIANTS = ((None, "text"),)
+
+    def __init__(self, engine, host="127.0.0.1", port=8080, workers=None, mode=None,
+                 cache_bytes=64 * 1024 * 1024, prefetch=True):
+        self.engine = engine
+        self.host = host
+        self.port = port
+        self.pool = EnginePool(engine, workers, mode)
+        self.response_cache = ResponseCache(cache_bytes)
+        self.prefetch = prefetch
+        self.prefetched = threading.Event()  # set after each completed warm-up pass
+        self.today = date.today
+        self._inflight = {}  # cache key -> future of the render in progress
+        self._prefetch_task = None
+        self._server = None
+        self._loop = None
+        self._thread = None
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]  # resolves port 0
+        if self.prefetch:
+            self._prefetch_task = asyncio.get_running_loop().create_task(self._prefetch_loop())
+        return self
+
+    async def serve_forever(self):
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    def serve_in_background(self):
+        """Starts the server on a daemon thread; returns once it is listening."""
+        started = threading.Event()
+
+        def run():
+            self._loop = asyncio.new_event_loop()
+            self._loop.run_until_complete(self.start())
+            started.set()
+            self._loop.run_forever()
+            if self._prefetch_task is not None:
+                self._prefetch_task.cancel()
+            self._server.close()
+            self._loop.run_until_complete(self._server.wait_closed())
+            self._loop.close()
+
+        self._thread = threading.Thread(target=run, name="engine-server", daemon=True)
+        self._thread.start()
+        started.wait()
+        return self
+
+    def shutdown(self):
+        if self._thread is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._thread = None
+        elif self._server is not None:
+            if self._prefetch_task is not None:
+                self._prefetch_task.cancel()
+            self._server.close()
+        self.pool.shutdown()
+
+    # --- HTTP ---
+
+    async def _handle(self, reader, writer):
+        try:
+            request_line = await reader.readline()
+            while True:  # headers (ignored); GET requests carry no body
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+            try:
+                try:
+                    method, target, _ = request_line.decode("latin-1").split(" ", 2)
+                except ValueError:
+                    raise HTTPError(400, "malformed request line") from None
+                status = 200
+                content_type, body = await self.dispatch(method, target)
+            except HTTPError as e:
+                status, content_type, body = e.status, "application/json", self._json({"error": str(e)})
+            except Exception as e:
+                self.engine.log(f"Server: {type(e).__name__}: {e}")
+                status, content_type, body = 500, "application/json", self._json({"error": type(e).__name__})
+            writer.write((f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+                          f"Content-Type: {content_type}\r\n"
+                          f"Content-Length: {len(body)}\r\n"
+                          "Connection: close\r\n\r\n").encode("latin-1") + body)
+            await writer.drain()
+        finally:
+            writer.close()
+
+    def _json(self, data):
+        return json.dumps(data, ensure_ascii=False, default=str).encode("utf-8")
+
+    async def dispatch(self, method, target):
+        """Routes one request; returns (content_type, body bytes) or raises HTTPError."""
+        if method != "GET":
+            raise HTTPError(405, f"{method} not supported")
+        url = urlsplit(target)
+        parts = [unquote(p) for p in url.path.strip("/").split("/") if p]
+        query = parse_qs(url.query)
+
+        if parts == ["health"]:
+            return "application/json", self._json({"status": "ok", "version": self.engine.version_id,
+                                                   "workers": self.pool.workers, "mode": self.pool.mode})
+        if len(parts) != 2 or parts[0] not in ("context", "rubrics", "booklet"):
+            raise HTTPError(404, f"no route for {url.path}")
+        endpoint, target_date = parts[0], self._parse_date(parts[1])
+
+        if endpoint == "context":
+            return "application/json", self._json(await self.pool.run(context_job, target_date))
+        if endpoint == "rubrics":
+            return "application/json", self._json(await self.pool.run(rubrics_job, target_date))
+
+        services = [s for value in query.get("service", []) for s in value.split(",") if s] or None
+        role = query.get("role", [None])[0]
+        fmt = query.get("format", ["text"])[0]
+        if fmt not in RENDERERS:
+            raise HTTPError(400, f"unknown format {fmt!r}")
+        if role and role != "all" and role.lower() not in ROLE_VIEWS:
+            raise HTTPError(400, f"unknown role {role!r}")
+        return CONTENT_TYPES[fmt], await self.booklet(target_date, services, role, fmt)
+
+    # --- Response Cache / Prefetch ---
+
+    def cache_key(self, target_date, services=None, role=None, fmt="text"):
+        engine = self.engine
+        recension = (engine.version_id, engine.fixed_recension_path, engine.variable_recension_path,
+                     engine.external_assets_dir)
+        role = role.lower() if role and role != "all" else None
+        return (target_date, recension, engine.temple_feast_date, role, fmt,
+                tuple(sorted(s.lower() for s in services)) if services else None)
+
+    async def booklet(self, target_date, services=None, role=None, fmt="text"):
+        """
+        The rendered booklet body: from the response cache, else rendered on the pool.
+        Concurrent requests for the same key (e.g. a request racing the prefetcher) share one render.
+        """
+        key = self.cache_key(target_date, services, role, fmt)
+        body = self.response_cache.get(key)
+        if body is not None:
+            return body
+        pending = self._inflight.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        pending = self._inflight[key] = asyncio.get_running_loop().create_future()
+        try:
+            body = (await self.pool.run(booklet_job, target_date, services, role, fmt)).encode("utf-8")
+        except asyncio.CancelledError:
+            pending.cancel()
+            raise
+        except Exception as e:
+            pending.set_exception(e)
+            pending.exception()  # retrieved: waiters (if any) re-raise it themselves
+            raise
+        finally:
+            del self._inflight[key]
+        self.response_cache.put(key, body)
+        pending.set_result(body)
+        return body
+
+    def hot_dates(self):
+        """Dates the prefetcher keeps warm: the next PREFETCH_DAYS days and the next Great Feast."""
+        today = self.today()
+        dates = [today + timedelta(days=n) for n in range(self.PREFETCH_DAYS)]
+        feast = self.engine.next_great_feast(today)
+        if feast is not None and feast not in dates:
+            dates.append(feast)
+        return dates
+
+    async def warm(self):
+        """Renders every hot date / PREFETCH_VARIANT not already cached. Returns the number rendered."""
+        rendered = 0
+        for target_date in self.hot_dates():
+            for role, fmt in self.PREFETCH_VARIANTS:
+                if self.cache_key(target_date, None, role, fmt) in self.response_cache:
+                    continue
+                try:
+                    await self.booklet(target_date, None, role, fmt)
+                    rendered += 1
+                except Exception as e:
+                    self.engine.log(f"Prefetch: {target_date} failed: {type(e).__name__}: {e}")
+        return rendered
+
+    async def _prefetch_loop(self):
+        while True:
+            await self.warm()
+            self.prefetched.set()
+            # Wake shortly after midnight, when a new day enters the window
+            now = datetime.now()
+            midnight = datetime.combine(now.date() + timedelta(days=1), datetime.min.time())
+            await asyncio.sleep((midnight - now).total_seconds() + 1)
+
+    def _parse_date(self, text):
+        try:
+            return date.fromisoformat(text)
+        except ValueError:
+            raise HTTPError(400, f"invalid date {text!r} (expected YYYY-MM-DD)") from None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ruthenian Liturgikon HTTP service")
+    parser.add_argument("--host", type=str, default="127.0.0.1", help="Interface to bind")
+    parser.add_argument("--port", type=int, default=8080, help="Port to listen on")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: CPU count)")
+    parser.add_argument("--threads", action="store_true", help="Use worker threads instead of processes")
+    parser.add_argument("--version", type=str, default="stamford_2014", help="Recension Version ID")
+    parser.add_argument("--external", type=str, help="Path to external private assets directory")
+    parser.add_argument("--cache", action="store_true", help="Enable the on-disk booklet cache")
+    parser.add_argument("--no-prefetch", action="store_true", help="Do not warm the coming days in the background")
+    args = parser.parse_args()
+
+    engine = RuthenianEngine(version=args.version, external_assets_dir=args.external, booklet_cache=args.cache)
+    server = EngineServer(engine, args.host, args.port, args.workers, "thread" if args.threads else None,
+                          prefetch=not args.no_prefetch)
+    print(f"[OK] Serving on http://{args.host}:{args.port} ({server.pool.workers} {server.pool.mode} workers)")
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.pool.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -319,18 +319,28 @@ def main():
         with open(f"cantor_prototypes/{name}_stamford.txt", "w", encoding="utf-8") as f:
             f.write(text_out)
 
-    # Test 2: Other (Empty/Alternative)
+    # Test 2: Other (Empty/Alternative), switched per scenario on the same engine
     print("\n>>> Testing Version: OTHER <<<")
-    engine_other = RuthenianEngine(version="other")
     
+    try:
+        engine_stamford.text_view("other")
+    except FileNotFoundError as e:
+        print(f"[SKIP] {e}")
+        scenarios = []
+
     for name, date_obj in scenarios:
         print(f"Generating {name} (Other)...")
-        context = engine_other.get_liturgical_context(date_obj)
-        rubrics = engine_other.resolve_rubrics(context)
-        text_out = renderer.render_structure(engine_other, context, rubrics)
+        context = engine_stamford.get_liturgical_context(date_obj)
+        rubrics = engine_stamford.resolve_rubrics(context)
+        with engine_stamford.recension("other"):
+            text_out = renderer.render_structure(engine_stamford, context, rubrics)
         
         with open(f"cantor_prototypes/{name}_other.txt", "w", encoding="utf-8") as f:
             f.write(text_out)
+
+        # Both recensions side by side from one resolution pass
+        with open(f"cantor_prototypes/{name}_parallel.txt", "w", encoding="utf-8") as f:
+            f.write(engine_stamford.generate_parallel(context, ["stamford", "other"], rubrics=rubrics, fmt="cantor"))
             
     print("Done. Check 'cantor_prototypes' folder for versioned outputs.")
 
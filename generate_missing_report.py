@@ -1,6 +1,6 @@
 
-import json
 import os
+from ruthenian_engine import RuthenianEngine
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 JSON_DB = os.path.join(BASE_DIR, "json_db", "stamford")
@@ -11,28 +11,22 @@ def generate_missing_report():
     
     missing_log = []
     
-    # 1. Audit Octoechos (Tones 1-8)
+    # 1. Audit Octoechos (Tones 1-8), from the engine's text index
     octoechos_path = os.path.join(JSON_DB, "text_octoechos.json")
     if os.path.exists(octoechos_path):
-        with open(octoechos_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            
-        print(f"Loaded Octoechos: {len(data)} items found.")
+        engine = RuthenianEngine(BASE_DIR)
         
         for tone in range(1, 9):
-            # Check if ANY key starts with tone_X
-            found = False
-            for k in data.keys():
-                if k.startswith(f"tone_{tone}"):
-                    found = True
-                    break
+            # Every text under tone_X (tone_X.sat_vespers..., tone_X.sun_matins...)
+            found = engine.keys_under(f"tone_{tone}")
             
             if not found:
                 msg = f"[MISSING] Octoechos Tone {tone} - Full Set (Vespers, Matins, Liturgy)"
                 missing_log.append(msg)
                 print(msg)
             else:
-                print(f"[OK] Tone {tone} Present")
+                services = sorted({key.split(".")[1] for key in found if key.count(".") >= 2})
+                print(f"[OK] Tone {tone} Present ({len(found)} items: {', '.join(services)})")
     else:
         missing_log.append("[CRITICAL] text_octoechos.json not found!")
 
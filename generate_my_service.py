@@ -22,6 +22,8 @@ def main():
     parser.add_argument("--version", type=str, default="stamford_2014", help="Recension Version ID")
     parser.add_argument("--external", type=str, help="Path to external private assets directory")
     parser.add_argument("--no-open", action="store_true", help="Do not open the file automatically")
+    parser.add_argument("--end", type=str, help="Generate every date from --date to --end (YYYY-MM-DD)")
+    parser.add_argument("--workers", type=int, help="Worker processes for --end batches (default: CPU count)")
     
     args = parser.parse_args()
 
@@ -54,17 +56,13 @@ def main():
             if rubrics['overrides']:
                 print(f"   Overrides: {rubrics['overrides']}")
 
-            # 5. Generate Booklet
+            # 5. Generate Booklet (streamed to disk slot by slot)
             print("   Compiling...")
-            full_text = engine.generate_full_booklet(ctx, rubrics)
-
-            # 6. Save and Open
             filename = f"Service_{target_date}.txt"
-            with open(filename, "w", encoding="utf-8") as f:
-                f.write(full_text)
-
+            engine.write_booklet(ctx, rubrics, filename)
             print(f"[OK] Generated: {filename}")
             
+            # 6. Open
             if not args.no_open:
                 open_file(filename)
                 
@@ -75,8 +73,26 @@ def main():
             import traceback
             traceback.print_exc()
 
+    # Batch Mode: one file per day, rendered on a process pool
+    def process_range(start_str, end_str):
+        try:
+            start = date(*map(int, start_str.split("-")))
+            end = date(*map(int, end_str.split("-")))
+        except ValueError:
+            print("[ERROR] Invalid Date Format. Use YYYY-MM-DD.")
+            return
+        count = 0
+        for result in engine.generate_range(start, end, workers=args.workers):
+            filename = f"Service_{result['date']}.txt"
+            with open(filename, "w", encoding="utf-8") as f:
+                f.write(result["booklet"])
+            count += 1
+        print(f"[OK] Generated {count} booklets ({start} -> {end})")
+
     # 2. Determine Mode
-    if args.date:
+    if args.date and args.end:
+        process_range(args.date, args.end)
+    elif args.date:
         # CLI Mode
         process_date(args.date)
     else:
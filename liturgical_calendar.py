@@ -0,0 +1,286 @@
+import threading
+from array import array
+from collections import namedtuple
+from datetime import date, timedelta
+
+SEASONS = ("octoechos", "triodion", "pentecostarion")
+TRIODION_PERIODS = ("normal", "pascha", "holy_saturday", "holy_friday", "bright_week", "sunday_thomas",
+                    "ascension", "pentecost", "monday_holy_spirit", "lent_weekday")
+# Bright Week changes tone daily (Grave Tone 7 is skipped on Bright Saturday)
+BRIGHT_WEEK_TONES = (1, 2, 3, 4, 5, 6, 8)
+
+CalendarDay = namedtuple("CalendarDay", "date pascha_offset day_of_week season_id triodion_period tone eothinon")
+
+
+def compute_pascha(year):
+    """Meeus/Butcher computus (the engine's Paschalion)."""
+    a = year % 19
+    b = year // 100
+    c = year % 100
+    d = b // 4
+    e = b % 4
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i = c // 4
+    k = c % 4
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month = (h + l - 7 * m + 114) // 31
+    day = ((h + l - 7 * m + 114) % 31) + 1
+    return date(year, month, day)
+
+
+def triodion_period_name(delta):
+    if delta == 0: return "pascha"
+    if delta == -1: return "holy_saturday"
+    if delta == -2: return "holy_friday"
+    if 1 <= delta <= 6: return "bright_week"
+    if delta == 7: return "sunday_thomas"
+    if delta == 39: return "ascension"
+    if delta == 49: return "pentecost"
+    if delta == 50: return "monday_holy_spirit"
+    if -48 <= delta <= -1: return "lent_weekday"
+    return "normal"
+
+
+def season_name(delta):
+    if -70 <= delta < 0:
+        return "triodion"
+    if 0 <= delta <= 56:
+        return "pentecostarion"
+    return "octoechos"
+
+
+def octoechos_tone(delta, prev_delta):
+    """
+    Tone of the week (1-8). The cycle starts with Tone 1 on Thomas Sunday (+7);
+    days before this year's Pascha continue the previous year's cycle (prev_delta).
+    """
+    if 0 <= delta < 7:
+        return BRIGHT_WEEK_TONES[delta]
+    if delta < 0:
+        delta = prev_delta
+    return ((delta - 7) // 7) % 8 + 1
+
+
+def eothinon_number(delta):
+    """
+    Resurrectional Gospel (1-11), as in resolve_matins_gospel: All Saints (+56) = Eothinon 1.
+    0 during the Pentecostarion, whose Sundays have their own Gospels.
+    """
+    if 0 <= delta < 56:
+        return 0
+    return ((delta - 56) // 7) % 11 + 1
+
+
+class YearTable:
+    """
+    One civil year of the calendar as parallel columns, indexed by day of year (0-based).
+    Seasons and periods are stored as indexes into SEASONS / TRIODION_PERIODS.
+    """
+
+    __slots__ = ("year", "first", "first_ordinal", "pascha",
+                 "pascha_offset", "day_of_week", "season", "period", "tone", "eothinon")
+
+    def __init__(self, year):
+        self.year = year
+        self.first = date(year, 1, 1)
+        self.first_ordinal = self.first.toordinal()
+        self.pascha = compute_pascha(year)
+        prev_pascha = compute_pascha(year - 1)
+        days = (date(year + 1, 1, 1) - self.first).days
+
+        start = (self.first - self.pascha).days
+        prev_start = (self.first - prev_pascha).days
+        first_dow = (self.first.weekday() + 1) % 7  # Sunday = 0
+        season_index = {name: i for i, name in enumerate(SEASONS)}
+        period_index = {name: i for i, name in enumerate(TRIODION_PERIODS)}
+
+        self.pascha_offset = array("h", range(start, start + days))
+        self.day_of_week = array("b", ((first_dow + n) % 7 for n in range(days)))
+        self.season = array("b", (season_index[season_name(d)] for d in self.pascha_offset))
+        self.period = array("b", (period_index[triodion_period_name(d)] for d in self.pascha_offset))
+        self.tone = array("b", (octoechos_tone(d, prev_start + n) for n, d in enumerate(self.pascha_offset)))
+        self.eothinon = array("b", (eothinon_number(d) for d in self.pascha_offset))
+
+    def __len__(self):
+        return len(self.pascha_offset)
+
+    def row(self, n):
+        return CalendarDay(self.first + timedelta(days=n), self.pascha_offset[n], self.day_of_week[n],
+                           SEASONS[self.season[n]], TRIODION_PERIODS[self.period[n]],
+                           self.tone[n], self.eothinon[n])
+
+    def __iter__(self):
+        for n in range(len(self)):
+            yield self.row(n)
+
+
+class LiturgicalCalendar:
+    """
+    Paschalion tables built once per year and shared by every engine (see LiturgicalCalendar.shared()).
+    Lookups are a day-of-year index into the year's YearTable.
+    """
+
+    _shared = None
+
+    def __init__(self):
+        self._years = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def shared(cls):
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+
+    def year(self, year):
+        table = self._years.get(year)
+        if table is None:
+            with self._lock:
+                table = self._years.get(year)
+                if table is None:
+                    table = self._years[year] = YearTable(year)
+        return table
+
+    def pascha(self, year):
+        return self.year(year).pascha
+
+    def row(self, target_date):
+        table = self.year(target_date.year)
+        return table.row(target_date.toordinal() - table.first_ordinal)
+
+    def context(self, target_date, temple_feast_date=None):
+        """Base liturgical context (same keys as RuthenianEngine.get_liturgical_context)."""
+        table = self.year(target_date.year)
+        n = target_date.toordinal() - table.first_ordinal
+        is_temple_feast = bool(temple_feast_date and temple_feast_date == (target_date.month, target_date.day))
+        return {"date": target_date.isoformat(), "year": target_date.year, "month": target_date.month,
+                "day": target_date.day, "day_of_week": table.day_of_week[n],
+                "pascha_offset": table.pascha_offset[n],
+                "triodion_period": TRIODION_PERIODS[table.period[n]],
+                "season_id": SEASONS[table.season[n]],
+                "is_temple_feast": is_temple_feast}
+
+
+# --- Vectorized Sweeps (optional NumPy) ---
+
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()  # datetime64[D] counts days from here
+
+def _require_numpy():
+    try:
+        import numpy as np
+    except ImportError as e:
+        raise ImportError("contexts_for_range requires NumPy (pip install numpy)") from e
+    return np
+
+
+def _pascha_days(np, years):
+    """compute_pascha() over an array of years, as datetime64[D]."""
+    a = years % 19
+    b = years // 100
+    c = years % 100
+    d = b // 4
+    e = b % 4
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i = c // 4
+    k = c % 4
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month = (h + l - 7 * m + 114) // 31
+    day = ((h + l - 7 * m + 114) % 31) + 1
+    months = (years - 1970) * 12 + (month - 1)
+    return months.astype("datetime64[M]").astype("datetime64[D]") + (day - 1)
+
+
+class ContextColumns:
+    """
+    Liturgical contexts for a date range as NumPy columns (see contexts_for_range).
+    Seasons and periods are index columns into SEASONS / TRIODION_PERIODS;
+    context(i) / iteration give the same dicts as RuthenianEngine.get_liturgical_context.
+    """
+
+    COLUMNS = ("dates", "year", "month", "day", "day_of_week", "pascha_offset",
+               "season", "period", "tone", "eothinon", "is_temple_feast")
+
+    def __init__(self, **columns):
+        for name in self.COLUMNS:
+            setattr(self, name, columns[name])
+
+    def __len__(self):
+        return len(self.dates)
+
+    def season_names(self):
+        return [SEASONS[i] for i in self.season.tolist()]
+
+    def period_names(self):
+        return [TRIODION_PERIODS[i] for i in self.period.tolist()]
+
+    def context(self, i):
+        d = date.fromordinal(int(self.dates[i].astype("int64")) + _EPOCH_ORDINAL)
+        return {"date": d.isoformat(), "year": int(self.year[i]), "month": int(self.month[i]),
+                "day": int(self.day[i]), "day_of_week": int(self.day_of_week[i]),
+                "pascha_offset": int(self.pascha_offset[i]),
+                "triodion_period": TRIODION_PERIODS[self.period[i]],
+                "season_id": SEASONS[self.season[i]],
+                "is_temple_feast": bool(self.is_temple_feast[i])}
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self.context(i)
+
+
+def contexts_for_range(start, end, temple_feast_date=None):
+    """
+    Computes the context columns for every day from start to end (inclusive)
+    with array operations: the same computus and rules as the per-year tables.
+    """
+    np = _require_numpy()
+    dates = np.arange(np.datetime64(start, "D"), np.datetime64(end, "D") + 1)
+    month_start = dates.astype("datetime64[M]")
+    year = dates.astype("datetime64[Y]").astype("int64") + 1970
+    month = month_start.astype("int64") % 12 + 1
+    day = (dates - month_start.astype("datetime64[D]")).astype("int64") + 1
+    day_of_week = (dates.astype("int64") + 4) % 7  # 1970-01-01 was a Thursday; Sunday = 0
+
+    pascha_offset = (dates - _pascha_days(np, year)).astype("int64")
+    prev_offset = (dates - _pascha_days(np, year - 1)).astype("int64")
+
+    season = np.select([(pascha_offset >= -70) & (pascha_offset < 0),
+                        (pascha_offset >= 0) & (pascha_offset <= 56)],
+                       [SEASONS.index("triodion"), SEASONS.index("pentecostarion")],
+                       SEASONS.index("octoechos"))
+
+    # Same precedence as triodion_period_name()
+    period_rules = [
+        (pascha_offset == 0, "pascha"),
+        (pascha_offset == -1, "holy_saturday"),
+        (pascha_offset == -2, "holy_friday"),
+        ((pascha_offset >= 1) & (pascha_offset <= 6), "bright_week"),
+        (pascha_offset == 7, "sunday_thomas"),
+        (pascha_offset == 39, "ascension"),
+        (pascha_offset == 49, "pentecost"),
+        (pascha_offset == 50, "monday_holy_spirit"),
+        ((pascha_offset >= -48) & (pascha_offset <= -1), "lent_weekday"),
+    ]
+    period = np.select([cond for cond, _ in period_rules],
+                       [TRIODION_PERIODS.index(name) for _, name in period_rules],
+                       TRIODION_PERIODS.index("normal"))
+
+    bright = (pascha_offset >= 0) & (pascha_offset < 7)
+    tone_offset = np.where(pascha_offset < 0, prev_offset, pascha_offset)
+    tone = np.where(bright, np.array(BRIGHT_WEEK_TONES)[np.clip(pascha_offset, 0, 6)],
+                    ((tone_offset - 7) // 7) % 8 + 1)
+    eothinon = np.where((pascha_offset >= 0) & (pascha_offset < 56), 0, ((pascha_offset - 56) // 7) % 11 + 1)
+
+    if temple_feast_date:
+        is_temple_feast = (month == temple_feast_date[0]) & (day == temple_feast_date[1])
+    else:
+        is_temple_feast = np.zeros(len(dates), dtype=bool)
+
+    return ContextColumns(dates=dates, year=year, month=month, day=day, day_of_week=day_of_week,
+                          pascha_offset=pascha_offset, season=season, period=period, tone=tone,
+                          eothinon=eothinon, is_temple_feast=is_temple_feast)
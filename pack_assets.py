@@ -0,0 +1,27 @@
+import argparse
+import os
+import time
+from text_store import AssetStore
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pack an assets/<recension>/ tree into a single SQLite store")
+    parser.add_argument("--base-dir", type=str, default=".", help="Repository root containing assets/")
+    parser.add_argument("--folder", type=str, action="append", help="Recension folder under assets/ (repeatable). Default: stamford")
+    args = parser.parse_args()
+
+    print("=== RUTHENIAN ASSET PACKER ===")
+    for folder in args.folder or ["stamford"]:
+        assets_base = os.path.join(args.base_dir, "assets", folder)
+        if not os.path.isdir(assets_base):
+            print(f"[SKIP] {assets_base} (not found)")
+            continue
+        db_path = os.path.join(args.base_dir, "assets", f"{folder}.sqlite")
+
+        start = time.perf_counter()
+        count = AssetStore.pack(assets_base, db_path, on_error=lambda path, e: print(f"[ERROR] {path}: {e}"))
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        print(f"[OK] {folder}: {count} assets -> {db_path} ({elapsed_ms:.0f} ms)")
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,13 @@
 #!/usr/bin/env python3
 """
-Add flat key aliases to text files.
+Add flat key aliases to the master key registry.
 Text files have: horologion.vespers.psalm_103
 Structs expect: horologion.psalm_103
-This script adds the flat form as an alias key.
+This script registers the flat form as an alias of the hierarchical key in
+00_master_key_registry.json; the engine resolves aliases through its alias index,
+so the text files no longer need a duplicate entry under the flat key.
+Flat duplicates added by earlier runs of this script are removed from the text files
+(and registered instead) when their content matches the hierarchical entry.
 """
 import os
 import json
@@ -11,54 +15,83 @@ import re
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 STAMFORD_DIR = os.path.join(BASE_DIR, "json_db", "stamford")
+REGISTRY_PATH = os.path.join(BASE_DIR, "json_db", "00_master_key_registry.json")
+
+def register_alias(registry, canonical, alias):
+    """Adds alias to the canonical key's entry (creating domain / key entries as needed)."""
+    domain = registry.setdefault("domains", {}).setdefault(canonical.split('.')[0], {"keys": {}})
+    entry = domain.setdefault("keys", {}).setdefault(canonical, {})
+    aliases = entry.setdefault("aliases", [])
+    if alias in aliases:
+        return False
+    aliases.append(alias)
+    return True
 
 def add_flat_aliases():
-    """For each hierarchical key, add a flat version."""
-    
-    stats = {'files': 0, 'aliases_added': 0}
-    
+    """For each hierarchical key, register a flat version."""
+
+    stats = {'files': 0, 'aliases_added': 0, 'duplicates_removed': 0}
+
+    with open(REGISTRY_PATH, 'r', encoding='utf-8') as f:
+        registry = json.load(f)
+    canonical_keys = {key for domain in registry.get("domains", {}).values() for key in domain.get("keys", {})}
+
     for filename in os.listdir(STAMFORD_DIR):
         if not filename.endswith('.json'):
             continue
-            
+
         filepath = os.path.join(STAMFORD_DIR, filename)
         with open(filepath, 'r', encoding='utf-8') as f:
             data = json.load(f)
-        
-        new_entries = {}
-        
-        for key, value in list(data.items()):
+
+        duplicates = []
+        flat_sources = {}
+
+        for key in data:
             # Check if key has 3+ parts (e.g., horologion.vespers.psalm_103)
             parts = key.split('.')
             if len(parts) >= 3:
                 # Create flat version: domain.last_part
                 domain = parts[0]
                 item_name = parts[-1]
-                flat_key = f"{domain}.{item_name}"
-                
-                # Only add if flat_key doesn't already exist
-                if flat_key not in data and flat_key not in new_entries:
-                    new_entries[flat_key] = value
-                    stats['aliases_added'] += 1
-        
-        # Merge new entries
-        if new_entries:
-            data.update(new_entries)
+                flat_sources.setdefault(f"{domain}.{item_name}", []).append(key)
+
+        for flat_key, keys in flat_sources.items():
+            # Ambiguous (eothinon.1.gospel, eothinon.2.gospel, ...) or canonical flat keys stay as they are
+            if len(keys) > 1 or flat_key in canonical_keys:
+                continue
+            key = keys[0]
+            if flat_key in data:
+                if data[flat_key] != data[key]:
+                    continue
+                duplicates.append(flat_key)
+            if register_alias(registry, key, flat_key):
+                stats['aliases_added'] += 1
+
+        # Drop the duplicated entries
+        if duplicates:
+            for flat_key in duplicates:
+                data.pop(flat_key, None)
             with open(filepath, 'w', encoding='utf-8') as f:
                 json.dump(data, f, indent=4, ensure_ascii=False)
-            print(f"  {filename}: {len(new_entries)} flat aliases added")
+            print(f"  {filename}: {len(duplicates)} duplicate flat entries removed")
+            stats['duplicates_removed'] += len(duplicates)
             stats['files'] += 1
-    
+
+    with open(REGISTRY_PATH, 'w', encoding='utf-8') as f:
+        json.dump(registry, f, indent=4, ensure_ascii=False)
+
     return stats
 
 def main():
     print("=" * 60)
     print("ADDING FLAT KEY ALIASES")
     print("=" * 60)
-    
+
     stats = add_flat_aliases()
-    
-    print(f"\nComplete: {stats['aliases_added']} aliases added across {stats['files']} files")
+
+    print(f"\nComplete: {stats['aliases_added']} aliases registered, "
+          f"{stats['duplicates_removed']} duplicates removed across {stats['files']} files")
 
 if __name__ == "__main__":
     main()
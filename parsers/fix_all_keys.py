@@ -2,6 +2,8 @@
 """
 Fix all Master Key normalization issues.
 Adds domain prefixes to text file keys to match struct file expectations.
+The old keys are registered as aliases in 00_master_key_registry.json, which the
+engine resolves at lookup time (no duplicate entries in the text files).
 """
 import os
 import json
@@ -10,6 +12,7 @@ from collections import defaultdict
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 STAMFORD_DIR = os.path.join(BASE_DIR, "json_db", "stamford")
+REGISTRY_PATH = os.path.join(BASE_DIR, "json_db", "00_master_key_registry.json")
 
 # ============================================================================
 # KEY MAPPING: Old key -> New Master Key format
@@ -243,12 +246,9 @@ def normalize_json_file(filepath, key_maps, stats):
         
         new_data[new_key] = value
         
-        # Track alias for backward compatibility
-        if new_key != old_key and isinstance(value, dict):
-            if '_aliases' not in value:
-                value['_aliases'] = []
-            if old_key not in value.get('_aliases', []):
-                value['_aliases'].append(old_key)
+        # Track alias for backward compatibility (registered in the key registry by main)
+        if new_key != old_key:
+            stats.setdefault('renames', []).append((old_key, new_key))
     
     # Write updated file
     with open(filepath, 'w', encoding='utf-8') as f:
@@ -260,6 +260,24 @@ def normalize_json_file(filepath, key_maps, stats):
     
     return changes
 
+def register_aliases(renames):
+    """Records old -> new key renames as aliases of the new keys in the master key registry."""
+    with open(REGISTRY_PATH, 'r', encoding='utf-8') as f:
+        registry = json.load(f)
+    
+    added = 0
+    for old_key, new_key in renames:
+        domain = registry.setdefault("domains", {}).setdefault(new_key.split('.')[0], {"keys": {}})
+        entry = domain.setdefault("keys", {}).setdefault(new_key, {})
+        aliases = entry.setdefault("aliases", [])
+        if old_key not in aliases:
+            aliases.append(old_key)
+            added += 1
+    
+    with open(REGISTRY_PATH, 'w', encoding='utf-8') as f:
+        json.dump(registry, f, indent=4, ensure_ascii=False)
+    return added
+
 def fix_struct_file_psalms():
     """Fix uncategorized psalm refs in struct files to use horologion. prefix."""
     json_db = os.path.join(BASE_DIR, "json_db")
@@ -313,6 +331,11 @@ def main():
     print("\n[PHASE 2] Fixing struct file references...")
     struct_changes = fix_struct_file_psalms()
     
+    # Phase 3: Register the old keys as aliases
+    print("\n[PHASE 3] Registering old keys as aliases...")
+    alias_count = register_aliases(stats.get('renames', []))
+    print(f"  {alias_count} aliases registered in {os.path.basename(REGISTRY_PATH)}")
+    
     print("\n" + "=" * 60)
     print(f"COMPLETE: {stats['keys_normalized']} text keys + {struct_changes} struct refs fixed")
     print("=" * 60)
@@ -1,9 +1,20 @@
 #!/usr/bin/env python3
-"""Full gap analysis: Compare struct-required keys vs text file keys."""
+"""
+Full gap analysis: Compare struct-required keys vs text file keys.
+Text keys come from the engine's text index (compiled snapshot, no text file is re-read);
+aliases from 00_master_key_registry.json count as present.
+"""
 import os
+import sys
 import json
 import re
 
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from ruthenian_engine import RuthenianEngine
+from text_store import build_text_index
+
 def extract_struct_keys():
     """Get all keys required by struct files."""
     json_db = "json_db"
@@ -25,18 +36,15 @@ def extract_struct_keys():
     
     return keys
 
-def extract_text_file_keys():
+def extract_text_file_keys(engine):
     """Get all keys present in Stamford text files AND root json_db."""
-    keys = set()
+    keys = set(engine.keys_under(""))
     
-    # Check stamford folder
+    # Stamford files the engine does not load (e.g. text_liturgikon.json) are indexed directly
     stamford_dir = "json_db/stamford"
     for filename in os.listdir(stamford_dir):
-        if filename.endswith(".json"):
-            filepath = os.path.join(stamford_dir, filename)
-            with open(filepath, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            keys.update(data.keys())
+        if filename.endswith(".json") and filename not in engine.BULK_TEXT_FILES:
+            keys.update(build_text_index(os.path.join(stamford_dir, filename)))
     
     # Also check root json_db for components, id_registry, etc.
     root_dir = "json_db"
@@ -50,8 +58,9 @@ def extract_text_file_keys():
     return keys
 
 def analyze_gaps():
+    engine = RuthenianEngine(BASE_DIR)
     struct_keys = extract_struct_keys()
-    text_keys = extract_text_file_keys()
+    text_keys = extract_text_file_keys(engine)
     
     print("=" * 70)
     print("COMPLETE GAP ANALYSIS: Struct Requirements vs Text Files")
@@ -68,7 +77,7 @@ def analyze_gaps():
     # Check which keys are present
     for domain in domains:
         for key in domains[domain]['required']:
-            if key in text_keys:
+            if key in text_keys or engine.canonical_key(key) in text_keys:
                 domains[domain]['present'].append(key)
             else:
                 domains[domain]['missing'].append(key)
@@ -81,7 +90,8 @@ def analyze_gaps():
         total_missing += missing_count
         
         status = "OK" if missing_count == 0 else f"!! {missing_count} MISSING"
-        print(f"\n## {domain.upper()} ({len(d['required'])} required) [{status}]")
+        available = len(engine.keys_under(domain)) if domain != 'uncategorized' else 0
+        print(f"\n## {domain.upper()} ({len(d['required'])} required, {available} in engine) [{status}]")
         
         if d['missing']:
             print("  MISSING:")
@@ -0,0 +1,57 @@
+from collections import Counter
+
+
+class ResolutionSession:
+    """
+    Derived facts of one liturgical day (date, temple, recension): rank, rank_id,
+    paradigm, general_case and collision. Each is computed on first use and cached.
+
+    Resolvers keep calling engine.calculate_rank(context) etc.; while a session is
+    open for that context (RuthenianEngine.resolution_session) those calls read it,
+    otherwise a transient session computes the fact afresh.
+
+    deps collects the json_db inputs the day read (see dependencies.py).
+    """
+
+    __slots__ = ("engine", "context", "key", "computed", "deps", "_facts")
+
+    def __init__(self, engine, context):
+        self.engine = engine
+        self.context = context
+        self.key = (context.get("date"), bool(context.get("is_temple_feast")), engine.version_id)
+        self.computed = Counter()  # fact -> number of computations
+        self.deps = set()
+        self._facts = {}
+
+    def _fact(self, name, compute):
+        try:
+            return self._facts[name]
+        except KeyError:
+            pass
+        value = self._facts[name] = compute(self.context)
+        self.computed[name] += 1
+        return value
+
+    @property
+    def rank(self):
+        return self._fact("rank", self.engine._compute_rank)
+
+    @property
+    def rank_id(self):
+        return self._fact("rank_id", self.engine._compute_rank_id)
+
+    @property
+    def paradigm(self):
+        return self._fact("paradigm", self.engine._compute_paradigm)
+
+    @property
+    def general_case(self):
+        return self._fact("general_case", self.engine._compute_general_case)
+
+    @property
+    def collision(self):
+        return self._fact("collision", self.engine._compute_collision)
+
+    def invalidate(self):
+        """Drops every cached fact (e.g. after the context was edited in place)."""
+        self._facts.clear()
@@ -0,0 +1,369 @@
+"""
+Compiles JSON trigger / condition objects into predicate closures.
+
+A condition such as
+    {"season_id": "triodion", "day_of_week": [1, 2, 3, 4, 5]}
+becomes a function context -> bool that performs only the checks the
+condition contains, with list values turned into sets.
+check_condition() is the reference interpreter (the original
+RuthenianEngine._check_condition); compiled predicates must agree with it.
+
+Rule strings such as "day_of_week == 0 && rank >= 3" (04 / 02e / 02f)
+are handled by compile_expression() further below.
+"""
+import ast
+import operator
+import re
+from functools import lru_cache
+
+
+def check_condition(condition, context):
+    """
+    Evaluates complex triggers (ranges, weeks, exclusions).
+    """
+    if not condition: return True
+
+    # 0. Season ID (Critical for preventing leakage)
+    if "season_id" in condition:
+        if context.get("season_id") != condition["season_id"]: return False
+
+    # 1. Day of Week
+    if "day_of_week" in condition:
+        allowed = condition["day_of_week"]
+        if isinstance(allowed, int): allowed = [allowed]
+        if context["day_of_week"] not in allowed: return False
+
+    # 2. Triodion Period
+    if "triodion_period" in condition:
+        allowed = condition["triodion_period"]
+        current = context.get("triodion_period", "")
+        if isinstance(allowed, str): allowed = [allowed]
+        if current not in allowed: return False
+
+    # 3. Exclude Days (Requires 'triodion_key' injection)
+    if "exclude_days" in condition:
+        excluded = condition["exclude_days"]
+        active_key = context.get("triodion_key", "")
+        if active_key in excluded: return False
+
+    # 4. Pascha Offset
+    if "pascha_offset" in condition:
+        req = condition["pascha_offset"]
+        if context["pascha_offset"] != req: return False
+
+    # 5. Pascha Offset Range
+    if "pascha_offset_range" in condition:
+        rng = condition["pascha_offset_range"]
+        val = context["pascha_offset"]
+        if not (rng[0] <= val <= rng[1]): return False
+
+    # 6. Week (Lenten)
+    if "week" in condition:
+        allowed_weeks = condition["week"]
+        offset = context["pascha_offset"]
+        # Lent Starts -48. Week 1 = [-48, -42].
+        # Week = (Offset + 48) // 7 + 1
+        if offset >= -48:
+            current_week = (offset + 48) // 7 + 1
+            if current_week not in allowed_weeks: return False
+        else:
+            return False  # Pre-Lent, no 'week' concept in this schema?
+
+    return True
+
+
+def _members(values):
+    """A frozenset for list/tuple values (set lookup), otherwise the value itself (e.g. substring checks on a str)."""
+    if isinstance(values, (list, tuple)):
+        try:
+            return frozenset(values)
+        except TypeError:
+            pass
+    return values
+
+
+def _always(context):
+    return True
+
+
+def compile_condition(condition):
+    """
+    Returns a predicate context -> bool equivalent to check_condition(condition, context).
+    Checks run in the interpreter's order, so missing context keys fail the same way.
+    """
+    if not condition:
+        return _always
+    if not isinstance(condition, dict):
+        return lambda context: check_condition(condition, context)
+
+    checks = []
+
+    if "season_id" in condition:
+        season = condition["season_id"]
+        checks.append(lambda ctx: ctx.get("season_id") == season)
+
+    if "day_of_week" in condition:
+        allowed = condition["day_of_week"]
+        if isinstance(allowed, int):
+            day = allowed
+            checks.append(lambda ctx: ctx["day_of_week"] == day)
+        else:
+            days = _members(allowed)
+            checks.append(lambda ctx: ctx["day_of_week"] in days)
+
+    if "triodion_period" in condition:
+        allowed = condition["triodion_period"]
+        if isinstance(allowed, str):
+            period = allowed
+            checks.append(lambda ctx: ctx.get("triodion_period", "") == period)
+        else:
+            periods = _members(allowed)
+            checks.append(lambda ctx: ctx.get("triodion_period", "") in periods)
+
+    if "exclude_days" in condition:
+        excluded = _members(condition["exclude_days"])
+        checks.append(lambda ctx: ctx.get("triodion_key", "") not in excluded)
+
+    if "pascha_offset" in condition:
+        req = condition["pascha_offset"]
+        checks.append(lambda ctx: ctx["pascha_offset"] == req)
+
+    if "pascha_offset_range" in condition:
+        low, high = condition["pascha_offset_range"][0], condition["pascha_offset_range"][1]
+        checks.append(lambda ctx: low <= ctx["pascha_offset"] <= high)
+
+    if "week" in condition:
+        weeks = _members(condition["week"])
+
+        def in_week(ctx):
+            offset = ctx["pascha_offset"]
+            return offset >= -48 and (offset + 48) // 7 + 1 in weeks
+        checks.append(in_week)
+
+    if not checks:
+        return _always
+    if len(checks) == 1:
+        return checks[0]
+    checks = tuple(checks)
+    return lambda ctx: all(check(ctx) for check in checks)
+
+
+class ConditionCache:
+    """
+    Compiled predicates memoized by condition identity. The condition object is
+    kept alongside its predicate so its id() cannot be reused while cached.
+    """
+
+    def __init__(self, max_size=4096):
+        self.max_size = max_size
+        self._compiled = {}
+
+    def predicate(self, condition):
+        entry = self._compiled.get(id(condition))
+        if entry is None or entry[0] is not condition:
+            if len(self._compiled) >= self.max_size:
+                self._compiled.clear()
+            entry = self._compiled[id(condition)] = (condition, compile_condition(condition))
+        return entry[1]
+
+    def __len__(self):
+        return len(self._compiled)
+
+
+# --- Rule-string Expressions ---
+
+class ExpressionError(ValueError):
+    """A rule condition string outside the supported expression language."""
+
+
+def _typed(op):
+    """Wraps an ordering / membership operator so a missing (None) or mismatched operand is False."""
+    def checked(a, b):
+        try:
+            return op(a, b)
+        except TypeError:
+            return False
+    return checked
+
+
+_COMPARE_OPS = {
+    ast.Eq: operator.eq, ast.NotEq: operator.ne,
+    ast.Lt: _typed(operator.lt), ast.LtE: _typed(operator.le),
+    ast.Gt: _typed(operator.gt), ast.GtE: _typed(operator.ge),
+    ast.In: _typed(lambda a, b: a in b), ast.NotIn: _typed(lambda a, b: a not in b),
+    ast.Is: operator.is_, ast.IsNot: operator.is_not,
+}
+# Rank 1 is the most solemn, so "rank >= 3" means Rank 1-3: ordering on rank is reversed
+_SOLEMNITY_OPS = {ast.Lt: ast.Gt, ast.LtE: ast.GtE, ast.Gt: ast.Lt, ast.GtE: ast.LtE}
+_CONSTANT_NAMES = {"default": True}
+
+
+def _is_rank(node):
+    return isinstance(node, ast.Name) and node.id == "rank"
+
+
+def _compile_node(node):
+    """Compiles one expression AST node into a function env -> value."""
+    if isinstance(node, ast.Expression):
+        return _compile_node(node.body)
+
+    if isinstance(node, ast.Constant):
+        value = node.value
+        return lambda env: value
+
+    if isinstance(node, ast.Name):
+        if node.id in _CONSTANT_NAMES:
+            value = _CONSTANT_NAMES[node.id]
+            return lambda env: value
+        name = node.id
+        return lambda env: env.get(name)
+
+    if isinstance(node, (ast.List, ast.Tuple, ast.Set)):
+        items = [_compile_node(elt) for elt in node.elts]
+        if all(isinstance(elt, ast.Constant) for elt in node.elts):
+            values = tuple(elt.value for elt in node.elts)
+            try:
+                values = frozenset(values)
+            except TypeError:
+                pass
+            return lambda env: values
+        return lambda env: tuple(item(env) for item in items)
+
+    if isinstance(node, ast.BoolOp):
+        parts = [_compile_node(value) for value in node.values]
+        if isinstance(node.op, ast.And):
+            def all_of(env):
+                result = True
+                for part in parts:
+                    result = part(env)
+                    if not result: return result
+                return result
+            return all_of
+
+        def any_of(env):
+            result = False
+            for part in parts:
+                result = part(env)
+                if result: return result
+            return result
+        return any_of
+
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.Not):
+        operand = _compile_node(node.operand)
+        return lambda env: not operand(env)
+
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.USub) and isinstance(node.operand, ast.Constant):
+        value = -node.operand.value
+        return lambda env: value
+
+    if isinstance(node, ast.Compare):
+        links = []
+        left = node.left
+        for op, right in zip(node.ops, node.comparators):
+            op_type = type(op)
+            if op_type not in _COMPARE_OPS:
+                raise ExpressionError(f"unsupported operator {op_type.__name__}")
+            if op_type in _SOLEMNITY_OPS and (_is_rank(left) or _is_rank(right)):
+                op_type = _SOLEMNITY_OPS[op_type]
+            links.append((_COMPARE_OPS[op_type], _compile_node(right)))
+            left = right
+        first = _compile_node(node.left)
+
+        def compare(env):
+            value = first(env)
+            for op, right in links:
+                other = right(env)
+                if not op(value, other): return False
+                value = other
+            return True
+        return compare
+
+    if (isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute) and node.func.attr == "get"
+            and isinstance(node.func.value, ast.Name) and not node.keywords
+            and 1 <= len(node.args) <= 2 and all(isinstance(arg, ast.Constant) for arg in node.args)):
+        # mapping.get('key'[, default]), e.g. context.get('is_pentecost')
+        mapping = node.func.value.id
+        args = tuple(arg.value for arg in node.args)
+        return lambda env: (env.get(mapping) or {}).get(*args)
+
+    raise ExpressionError(f"unsupported syntax {type(node).__name__}")
+
+
+@lru_cache(maxsize=None)
+def compile_expression(text):
+    """
+    Compiles a rule condition string into a predicate env -> bool.
+    The language is a Python expression subset: names, literals, lists, and/or/not
+    (also && / || / !), comparisons (==, !=, <, <=, >, >=, in, is) and mapping.get(...).
+    Names are looked up in env (missing -> None); "default" is always true.
+    Comparisons on rank are by solemnity (rank >= 3 is Rank 1-3).
+    Each distinct string is parsed once.
+    """
+    source = re.sub(r"!(?!=)", " not ", text.replace("&&", " and ").replace("||", " or "))
+    try:
+        tree = ast.parse(source.strip(), mode="eval")
+    except SyntaxError as e:
+        raise ExpressionError(f"cannot parse {text!r}: {e.msg}") from None
+    evaluate = _compile_node(tree)
+    return lambda env: bool(evaluate(env))
+
+
+# --- General Case Index (02a_logic_general.json) ---
+
+class _Other:
+    """Stands for every value no trigger list mentions."""
+
+    def __repr__(self):
+        return "OTHER"
+
+
+OTHER = _Other()
+
+
+class GeneralCaseIndex:
+    """
+    The General Cases compiled into a table keyed on (period, day_of_week, rank_id, feast_level).
+    Values that no trigger mentions all behave alike, so each dimension is reduced to
+    the values the triggers list plus OTHER, and every combination is resolved ahead of
+    time to the first matching case in file order (as the linear scan did).
+    """
+
+    DIMENSIONS = ("period", "day_of_week", "rank_id", "type")
+
+    def __init__(self, logic_definitions):
+        self.source = logic_definitions
+        self.cases = []
+        for key, case_def in logic_definitions.items():
+            if key.startswith("//"): continue
+            triggers = case_def.get("triggers", {})
+            if not triggers: continue  # e.g. date-based overrides, not matched here
+            self.cases.append((case_def, tuple(triggers.get(dim) if dim in triggers else None
+                                               for dim in self.DIMENSIONS)))
+
+        self.domains = [frozenset(value for _, lists in self.cases if lists[i] is not None for value in lists[i])
+                        for i in range(len(self.DIMENSIONS))]
+        self.table = {}
+        self._fill((), [sorted(domain, key=repr) + [OTHER] for domain in self.domains])
+
+    def _fill(self, prefix, classes):
+        if len(prefix) == len(classes):
+            self.table[prefix] = self.scan(*prefix)
+            return
+        for value in classes[len(prefix)]:
+            self._fill(prefix + (value,), classes)
+
+    def scan(self, *values):
+        """Linear first-match over the cases (OTHER is in no trigger list)."""
+        for case_def, lists in self.cases:
+            if all(allowed is None or (value is not OTHER and value in allowed)
+                   for value, allowed in zip(values, lists)):
+                return case_def
+        return None
+
+    def lookup(self, period, day_of_week, rank_id, feast_level):
+        values = (period, day_of_week, rank_id, feast_level)
+        try:
+            key = tuple(value if value in domain else OTHER for value, domain in zip(values, self.domains))
+        except TypeError:  # unhashable input
+            return self.scan(*values)
+        return self.table[key]
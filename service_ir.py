@@ -0,0 +1,555 @@
+"""
+Service IR: the resolved daily cycle as a compact tree, separate from its rendering.
+
+    BookletIR(context, title)
+      -> ServiceIR(name, root_id, file, note | error)
+           -> SlotIR(id, rubric, kind, refs, logic, items)
+
+Resolution (RuthenianEngine.build_service_ir) runs every structure and resolver once
+and records only text IDs; the renderers below fetch the texts when they format
+the tree, so one IR serves every output. TextRenderer reproduces
+RuthenianEngine.generate_full_booklet() exactly.
+"""
+import json
+import textwrap
+from itertools import zip_longest
+
+
+# Rubric actors each role sees (ALL / PEOPLE / CLERGY parts are shared)
+ROLE_VIEWS = {
+    "cantor": frozenset({"CANTOR", "CHOIR", "READER", "ALL", "PEOPLE"}),
+    "reader": frozenset({"READER", "ALL", "PEOPLE"}),
+    "priest": frozenset({"PRIEST", "CLERGY", "ALL"}),
+    "deacon": frozenset({"DEACON", "CLERGY", "ALL"}),
+    "subdeacon": frozenset({"SUBDEACON", "CLERGY", "ALL"}),
+}
+
+
+class Rubric:
+    """A slot rubric: a titled dict rubric with roles, or a plain string (text)."""
+
+    __slots__ = ("title", "source_ref", "roles", "text")
+
+    def __init__(self, title="", source_ref=None, roles=(), text=None):
+        self.title = title
+        self.source_ref = source_ref
+        self.roles = roles  # ((ROLE, text), ...)
+        self.text = text
+
+    @classmethod
+    def from_slot(cls, rubric):
+        if not isinstance(rubric, dict):
+            return cls(text=str(rubric))
+        source_ref = str(rubric["source_ref"]) if "source_ref" in rubric else None
+        roles = tuple((str(role).upper(), str(text)) for role, text in rubric.get("roles", {}).items())
+        return cls(str(rubric.get("title", "")), source_ref, roles)
+
+    def to_dict(self):
+        if self.text is not None:
+            return {"text": self.text}
+        return {"title": self.title, "source_ref": self.source_ref, "roles": [list(r) for r in self.roles]}
+
+    @classmethod
+    def from_dict(cls, data):
+        if "text" in data:
+            return cls(text=data["text"])
+        return cls(data["title"], data["source_ref"], tuple(tuple(r) for r in data["roles"]))
+
+
+class TextRef:
+    """A text ID a resolver chose, fetched through get_text(key, requirement) when rendered."""
+
+    __slots__ = ("key", "requirement", "depth")
+
+    def __init__(self, key, requirement=None, depth=0):
+        self.key = key
+        self.requirement = requirement
+        self.depth = depth
+
+    def to_dict(self):
+        return {"ref": self.key, "requirement": self.requirement, "depth": self.depth}
+
+
+class Note:
+    """A resolver result that is not a text ID (a summary or literal text line)."""
+
+    __slots__ = ("text", "depth")
+
+    def __init__(self, text, depth=0):
+        self.text = text
+        self.depth = depth
+
+    def to_dict(self):
+        return {"note": self.text, "depth": self.depth}
+
+
+def item_from_dict(data):
+    if "ref" in data:
+        return TextRef(data["ref"], data["requirement"], data["depth"])
+    return Note(data["note"], data["depth"])
+
+
+def logic_items(result, requirement, depth=0):
+    """
+    Flattens a resolver result into TextRef / Note items. Text keys (plain strings, ref_key,
+    ref_keys) become TextRefs; sequences / stacks list their components in order, one level
+    deeper; anything else is summarized.
+    """
+    if result is None:
+        return []
+    if isinstance(result, str):
+        return [TextRef(result, None, depth)]
+    if isinstance(result, (list, tuple)):
+        items = []
+        for item in result:
+            items.extend(logic_items(item, requirement, depth))
+        return items
+    if not isinstance(result, dict):
+        return [Note(f"=> {result}", depth)]
+
+    if "ref_key" in result:
+        return [TextRef(result["ref_key"], requirement, depth)]
+    if "ref_keys" in result:
+        return [TextRef(ref_key, requirement, depth) for ref_key in result["ref_keys"]]
+    if isinstance(result.get("content"), str) and result.get("type") == "text":
+        return [Note(result["content"], depth)]
+
+    summary = ", ".join(f"{k}={v}" for k, v in result.items()
+                        if k != "type" and isinstance(v, (str, int, float, bool)))
+    items = [Note(f"=> {result.get('type', 'result')}" + (f" ({summary})" if summary else ""), depth)]
+    for nested in ("components", "sequence"):
+        if isinstance(result.get(nested), list):
+            items.extend(logic_items(result[nested], requirement, depth + 1))
+    return items
+
+
+class SlotIR:
+    """
+    One resolved structure slot.
+    kind: the content type (fixed_ref / fixed_group / variable_logic / sequence, or None);
+    refs: its text IDs (or sequence components); logic: (function, args) of a variable_logic slot;
+    items: what the resolver produced (TextRef / Note), empty if it was not run.
+    """
+
+    __slots__ = ("id", "rubric", "kind", "refs", "logic", "items")
+
+    def __init__(self, id, rubric=None, kind=None, refs=(), logic=None, items=()):
+        self.id = id
+        self.rubric = rubric
+        self.kind = kind
+        self.refs = refs
+        self.logic = logic
+        self.items = items
+
+    @classmethod
+    def from_slot(cls, slot, items=(), aliases=None):
+        """
+        The structural part of a slot; items are supplied by the caller that ran its resolver.
+        aliases: optional {alias: canonical key} applied to fixed references.
+        """
+        rubric = Rubric.from_slot(slot["rubric"]) if "rubric" in slot else None
+        content = slot.get("content", {})
+        kind = content.get("type")
+        refs, logic = (), None
+        if kind == "fixed_ref":
+            ref = content.get("ref_key")
+            refs = (aliases.get(ref, ref) if aliases else ref,)
+        elif kind == "fixed_group":
+            refs = tuple(content.get("ref_keys", []))
+            refs = tuple(aliases.get(ref, ref) for ref in refs) if aliases else refs
+        elif kind == "variable_logic":
+            spec = content.get("logic", {})
+            logic = (spec.get("function"), str(spec.get("args", {})))
+        elif kind == "sequence":
+            refs = tuple(str(comp) for comp in content.get("components", []))
+        return cls(slot.get("id", "UNKNOWN_ID"), rubric, kind, refs, logic, tuple(items))
+
+    def text_ids(self):
+        """Every text ID this slot renders (fixed refs and resolver refs)."""
+        ids = list(self.refs) if self.kind in ("fixed_ref", "fixed_group") else []
+        ids.extend(item.key for item in self.items if isinstance(item, TextRef))
+        return ids
+
+    def to_dict(self):
+        return {"id": self.id, "rubric": self.rubric.to_dict() if self.rubric else None,
+                "kind": self.kind, "refs": list(self.refs), "logic": list(self.logic) if self.logic else None,
+                "items": [item.to_dict() for item in self.items]}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["id"], Rubric.from_dict(data["rubric"]) if data["rubric"] else None, data["kind"],
+                   tuple(data["refs"]), tuple(data["logic"]) if data["logic"] else None,
+                   tuple(item_from_dict(item) for item in data["items"]))
+
+
+class ServiceIR:
+    """One planned service: its root and slots, or a note (suppressed) / error (missing structure)."""
+
+    __slots__ = ("name", "root_id", "file", "note", "error", "slots")
+
+    def __init__(self, name, root_id=None, file=None, note=None, error=None, slots=()):
+        self.name = name
+        self.root_id = root_id
+        self.file = file
+        self.note = note
+        self.error = error
+        self.slots = slots
+
+    def to_dict(self):
+        return {"name": self.name, "root_id": self.root_id, "file": self.file, "note": self.note,
+                "error": self.error, "slots": [slot.to_dict() for slot in self.slots]}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["name"], data["root_id"], data["file"], data["note"], data["error"],
+                   tuple(SlotIR.from_dict(slot) for slot in data["slots"]))
+
+
+class BookletIR:
+    """The resolved daily cycle of one day (context, feast title and services in order)."""
+
+    __slots__ = ("context", "title", "services")
+
+    def __init__(self, context, title, services=()):
+        self.context = context
+        self.title = title
+        self.services = services
+
+    @property
+    def date(self):
+        return self.context.get("date")
+
+    def text_ids(self):
+        return [key for service in self.services for slot in service.slots for key in slot.text_ids()]
+
+    def for_role(self, role):
+        """
+        A view of the booklet keeping only the rubric parts of one role's actors (see ROLE_VIEWS).
+        Texts and structure are shared with this IR. role None / "all" returns the IR itself.
+        """
+        if not role or role == "all":
+            return self
+        try:
+            actors = ROLE_VIEWS[role.lower()]
+        except KeyError:
+            raise ValueError(f"Unknown role {role!r} (expected one of {', '.join(ROLE_VIEWS)})") from None
+        services = []
+        for service in self.services:
+            slots = []
+            for slot in service.slots:
+                rubric = slot.rubric
+                if rubric is not None and rubric.text is None:
+                    rubric = Rubric(rubric.title, rubric.source_ref,
+                                    tuple(part for part in rubric.roles if part[0] in actors))
+                slots.append(SlotIR(slot.id, rubric, slot.kind, slot.refs, slot.logic, slot.items))
+            services.append(ServiceIR(service.name, service.root_id, service.file, service.note,
+                                      service.error, tuple(slots)))
+        return BookletIR(self.context, self.title, tuple(services))
+
+    def to_dict(self):
+        return {"context": self.context, "title": self.title,
+                "services": [service.to_dict() for service in self.services]}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["context"], data["title"], tuple(ServiceIR.from_dict(s) for s in data["services"]))
+
+
+# --- Renderers ---
+
+class TextRenderer:
+    """The plain booklet (RuthenianEngine.generate_full_booklet's format). Texts come from engine."""
+
+    def __init__(self, engine):
+        self.engine = engine
+
+    def render(self, booklet):
+        return "\n".join(self.iter_lines(booklet))
+
+    def iter_lines(self, booklet):
+        yield self.header(booklet)
+        for service in booklet.services:
+            yield from self.service_lines(service, booklet.context)
+
+    def header(self, booklet):
+        return f"DATE: {booklet.date}\nFEAST: {booklet.title}\n"
+
+    def service_heading(self, service):
+        if service.note is not None:
+            return f"\n--- {service.name.upper()} ---\nNOTE: {service.note}"
+        return f"\n--- {service.name.upper()} ({service.root_id}) ---"
+
+    def service_lines(self, service, context=None):
+        yield self.service_heading(service)
+        if service.error is not None:
+            yield f"ERROR: {service.error}"
+        for slot in service.slots:
+            yield self.slot_line(slot, context)
+
+    def slot_line(self, slot, context=None):
+        return f"[{slot.id}] {self.slot_body(slot, context)}"
+
+    def slot_body(self, slot, context=None):
+        lines = []
+        rubric = slot.rubric
+        if rubric is not None:
+            if rubric.text is not None:
+                lines.append(f"   RUBRIC: {rubric.text}")
+            else:
+                lines.append(f"\n   >>> RUBRIC: {rubric.title} <<<")
+                if rubric.source_ref is not None: lines.append(f"   (Source): {rubric.source_ref}")
+                for role, text in rubric.roles: lines.append(f"   [{role}]: {text}")
+                lines.append("")
+
+        if slot.kind == "fixed_ref":
+            ref_key = slot.refs[0]
+            if ref_key in self.engine.text_db:
+                text_block = self.engine.text_db[ref_key]
+                title = text_block.get('title', ref_key) if isinstance(text_block, dict) else ref_key
+                lines.append(f"   >>> {title} <<<")
+                lines.append(self.engine._text_content(text_block))
+            else:
+                lines.append(f"   {ref_key}")
+        elif slot.kind == "fixed_group":
+            lines.append(f"   Group: {', '.join(slot.refs)}")
+        elif slot.kind == "variable_logic":
+            lines.append(f"   Logic: {slot.logic[0]} (Args: {slot.logic[1]})")
+            for item in slot.items:
+                lines.extend(self.item_lines(item, context))
+        elif slot.kind == "sequence":
+            lines.append("   Sequence:")
+            for comp in slot.refs:
+                lines.append(f"      - {comp}")
+        return "\n".join(lines)
+
+    def item_lines(self, item, context=None):
+        indent = "   " * (item.depth + 1)
+        if isinstance(item, Note):
+            return [f"{indent}{item.text}"]
+        text = self.engine.get_text(item.key, logic_requirement=item.requirement, context=context)
+        if text is None:
+            return [f"{indent}=> {item.key}"]
+        title = text.get('title', item.key) if isinstance(text, dict) else item.key
+        return [f"{indent}>>> {title} <<<", self.engine._text_content(text)]
+
+
+class MarkdownRenderer(TextRenderer):
+    """Markdown: a heading per service and slot, rubrics as block quotes, texts as paragraphs."""
+
+    def header(self, booklet):
+        return f"# {booklet.title}\n\n*{booklet.date}*\n"
+
+    def service_heading(self, service):
+        if service.note is not None:
+            return f"\n## {service.name}\n\n> {service.note}\n"
+        return f"\n## {service.name} (`{service.root_id}`)\n"
+
+    def service_lines(self, service, context=None):
+        yield self.service_heading(service)
+        if service.error is not None:
+            yield f"**ERROR:** {service.error}\n"
+        for slot in service.slots:
+            yield self.slot_body(slot, context)
+
+    def slot_line(self, slot, context=None):
+        return self.slot_body(slot, context)
+
+    def slot_body(self, slot, context=None):
+        lines = [f"### `{slot.id}`", ""]
+        rubric = slot.rubric
+        if rubric is not None:
+            if rubric.text is not None:
+                lines.append(f"> *{rubric.text}*")
+            else:
+                lines.append(f"> **{rubric.title}**" + (f" ({rubric.source_ref})" if rubric.source_ref else ""))
+                for role, text in rubric.roles:
+                    lines.append(">")
+                    lines.append(f"> **{role}:** {text}")
+            lines.append("")
+
+        if slot.kind == "fixed_ref":
+            lines.extend(self._text_block(slot.refs[0], self.engine.text_db.get(slot.refs[0])))
+        elif slot.kind == "fixed_group":
+            lines.append("Group: " + ", ".join(f"`{key}`" for key in slot.refs))
+            lines.append("")
+        elif slot.kind == "variable_logic":
+            lines.append(f"*Logic: `{slot.logic[0]}`*")
+            lines.append("")
+            for item in slot.items:
+                if isinstance(item, Note):
+                    lines.append("  " * item.depth + f"- {item.text}")
+                else:
+                    text = self.engine.get_text(item.key, logic_requirement=item.requirement, context=context)
+                    lines.extend(self._text_block(item.key, text))
+            lines.append("")
+        elif slot.kind == "sequence":
+            lines.extend(f"- {comp}" for comp in slot.refs)
+            lines.append("")
+        return "\n".join(lines)
+
+    def _text_block(self, key, text):
+        if text is None:
+            return [f"`{key}`", ""]
+        title = text.get('title', key) if isinstance(text, dict) else key
+        return [f"**{title}**", "", self.engine._text_content(text), ""]
+
+
+class CantorRenderer(TextRenderer):
+    """
+    The cantor's view (the layout of cantor_prototypes/*_cantor_view.txt): a banner per service,
+    one section per slot with its rubric, the actors' parts and the texts to be sung.
+    roles: optional set of actors to keep (e.g. {"CANTOR", "READER"}); None keeps them all.
+    """
+
+    def __init__(self, engine, roles=None):
+        super().__init__(engine)
+        self.roles = {role.upper() for role in roles} if roles else None
+
+    def header(self, booklet):
+        return f"\n{'=' * 40}\nCANTOR VIEW: {booklet.title}\n{'=' * 40}\n\nDate: {booklet.date}\n"
+
+    def service_heading(self, service):
+        heading = f"\n{'=' * 40}\n{service.name.upper().center(40)}\n{'=' * 40}\n"
+        if service.note is not None:
+            heading += f"\n   [!] RUBRIC: {service.note}"
+        return heading
+
+    def service_lines(self, service, context=None):
+        yield self.service_heading(service)
+        if service.error is not None:
+            yield f"   [!] ERROR: {service.error}"
+        for slot in service.slots:
+            body = self.slot_body(slot, context)
+            if body:
+                yield body
+
+    def slot_line(self, slot, context=None):
+        return self.slot_body(slot, context)
+
+    def slot_body(self, slot, context=None):
+        lines = []
+        rubric = slot.rubric
+        if rubric is not None and rubric.text is not None:
+            lines.append(f"\n   [!] RUBRIC: {rubric.text}")
+        elif rubric is not None:
+            title = rubric.title or slot.id
+            lines.extend([f"\n{title}", "-" * len(title)])
+            if rubric.source_ref: lines.append(f"   (Source: {rubric.source_ref})")
+            for role, text in rubric.roles:
+                if self.roles is None or role in self.roles:
+                    lines.append(f"\n   [{role}]: {text}")
+
+        texts = []
+        if slot.kind == "fixed_ref" and slot.refs[0] in self.engine.text_db:
+            texts.append((slot.refs[0], self.engine.text_db[slot.refs[0]], 0))
+        elif slot.kind == "variable_logic":
+            for item in slot.items:
+                if isinstance(item, TextRef):
+                    text = self.engine.get_text(item.key, logic_requirement=item.requirement, context=context)
+                    if text is not None:
+                        texts.append((item.key, text, item.depth))
+                elif not item.text.startswith("=>"):
+                    lines.append(f"\n   {item.text}")
+        for key, text, depth in texts:
+            indent = "   " * (depth + 1)
+            title = text.get('title', key) if isinstance(text, dict) else key
+            lines.append(f"\n{indent}>>> {str(title).upper()} <<<")
+            lines.extend(f"{indent}{line}" for line in self.engine._text_content(text).split("\n"))
+        return "\n".join(lines)
+
+
+class JSONRenderer:
+    """The IR as JSON, with every text reference resolved to {id, title, content} (None if unknown)."""
+
+    def __init__(self, engine, indent=2):
+        self.engine = engine
+        self.indent = indent
+
+    def render(self, booklet):
+        return json.dumps(self.to_dict(booklet), indent=self.indent, ensure_ascii=False, default=str)
+
+    def to_dict(self, booklet):
+        data = booklet.to_dict()
+        for service_data, service in zip(data["services"], booklet.services):
+            for slot_data, slot in zip(service_data["slots"], service.slots):
+                if slot.kind in ("fixed_ref", "fixed_group"):
+                    slot_data["texts"] = [self._text(key, self.engine.text_db.get(key)) for key in slot.refs]
+                for item_data, item in zip(slot_data["items"], slot.items):
+                    if isinstance(item, TextRef):
+                        item_data["text"] = self._text(item.key, self.engine.get_text(
+                            item.key, logic_requirement=item.requirement, context=booklet.context))
+        return data
+
+    def _text(self, key, text):
+        if text is None:
+            return None
+        title = text.get('title', key) if isinstance(text, dict) else key
+        return {"id": key, "title": title, "content": self.engine._text_content(text)}
+
+
+class ParallelRenderer:
+    """
+    Several recensions side by side from one IR. Every slot is rendered once per recension
+    (inside engine.recension(...)) by the column renderer, and the columns are wrapped and
+    aligned line by line; slots that read the same in every recension are printed once.
+    recensions: [(label, engine.recension() keyword arguments)].
+    """
+
+    SEPARATOR = " | "
+
+    def __init__(self, engine, recensions, renderer=TextRenderer, width=160):
+        self.engine = engine
+        self.recensions = list(recensions)
+        self.columns = renderer(engine)
+        self.column_width = max(20, (width - len(self.SEPARATOR) * (len(self.recensions) - 1)) // max(1, len(self.recensions)))
+
+    def render(self, booklet):
+        return "\n".join(self.iter_lines(booklet))
+
+    def iter_lines(self, booklet):
+        yield self.columns.header(booklet)
+        yield from self.aligned([label for label, _ in self.recensions])
+        yield self.SEPARATOR.join("-" * self.column_width for _ in self.recensions)
+        for service in booklet.services:
+            yield self.columns.service_heading(service)
+            if service.error is not None:
+                yield f"ERROR: {service.error}"
+            for slot in service.slots:
+                bodies = self.slot_columns(slot, booklet.context)
+                if any(body != bodies[0] for body in bodies):
+                    yield from self.aligned(bodies)
+                elif bodies[0]:
+                    yield bodies[0]
+
+    def slot_columns(self, slot, context=None):
+        """The slot as rendered against each recension's texts."""
+        bodies = []
+        for _, options in self.recensions:
+            with self.engine.recension(**options):
+                bodies.append(self.columns.slot_line(slot, context))
+        return bodies
+
+    def aligned(self, bodies):
+        """Wraps each body to the column width and joins the columns row by row."""
+        columns = [self._wrap(body) for body in bodies]
+        for row in zip_longest(*columns, fillvalue=""):
+            yield self.SEPARATOR.join(cell.ljust(self.column_width) for cell in row).rstrip()
+
+    def _wrap(self, body):
+        lines = []
+        for line in body.split("\n"):
+            indent = line[:len(line) - len(line.lstrip())]
+            lines.extend(textwrap.wrap(line, self.column_width, subsequent_indent=indent) or [""])
+        return lines
+
+
+RENDERERS = {"text": TextRenderer, "markdown": MarkdownRenderer, "json": JSONRenderer, "cantor": CantorRenderer}
+
+
+def render(booklet, engine, fmt="text", **options):
+    """Renders a BookletIR in one of RENDERERS' formats."""
+    try:
+        renderer = RENDERERS[fmt]
+    except KeyError:
+        raise ValueError(f"Unknown booklet format {fmt!r} (expected one of {', '.join(RENDERERS)})") from None
+    return renderer(engine, **options).render(booklet)
@@ -0,0 +1,45 @@
+import json
+import pytest
+from text_store import AssetStore
+from ruthenian_engine import RuthenianEngine
+
+@pytest.fixture
+def packed_store(tmp_path):
+    base = tmp_path / "assets" / "sample"
+    (base / "octoechos" / "tone_5").mkdir(parents=True)
+    (base / "horologion").mkdir(parents=True)
+    (base / "octoechos" / "tone_5" / "a1.json").write_text(json.dumps(
+        {"content": "Let us the faithful praise...", "_original_id": "tone_5.sat_vespers.stichera_lord_i_call"}))
+    (base / "octoechos" / "tone_5" / "a2.json").write_text(json.dumps(
+        {"content": "The Word co-eternal...", "_original_id": "tone_5.sun_matins.sessionals"}))
+    # Hashed file resolved through _id_map.json
+    (base / "horologion" / "deadbeef.json").write_text(json.dumps("Bless the Lord, O my soul."))
+    (base / "_id_map.json").write_text(json.dumps({"deadbeef": "horologion.vespers.psalm_103"}))
+
+    db_path = str(tmp_path / "sample.sqlite")
+    assert AssetStore.pack(str(base), db_path) == 3
+    return db_path
+
+def test_point_lookup_and_prefix_scan(packed_store):
+    store = AssetStore(packed_store)
+    assert len(store) == 3
+    assert store["horologion.vespers.psalm_103"] == "Bless the Lord, O my soul."
+    assert "tone_5.sun_matins.sessionals" in store
+    assert "tone_5.sun_matins" not in store
+    with pytest.raises(KeyError):
+        store["tone_6.sun_matins.sessionals"]
+    assert store.keys_with_prefix("tone_5.") == ["tone_5.sat_vespers.stichera_lord_i_call", "tone_5.sun_matins.sessionals"]
+
+def test_book_tone_service_columns(packed_store):
+    store = AssetStore(packed_store)
+    assert store.select(book="octoechos", tone=5) == ["tone_5.sat_vespers.stichera_lord_i_call", "tone_5.sun_matins.sessionals"]
+    assert store.select(service="sun_matins") == ["tone_5.sun_matins.sessionals"]
+    assert store.select(book="horologion", service="vespers") == ["horologion.vespers.psalm_103"]
+
+def test_engine_reads_through_packed_store(packed_store):
+    engine = RuthenianEngine(".", use_snapshot=False, asset_store=packed_store)
+    assert engine.asset_store is not None
+    item = engine.get_text("tone_5.sun_matins.sessionals")
+    assert item["content"] == "The Word co-eternal..."
+    # Bulk texts remain available underneath
+    assert engine.get_text("weekday.monday.troparion")
@@ -0,0 +1,38 @@
+from datetime import date
+import pytest
+from ruthenian_engine import RuthenianEngine
+
+DAY = date(2025, 2, 5)
+
+@pytest.fixture
+def cache_dir(tmp_path):
+    return str(tmp_path / "booklets")
+
+def test_dependencies_are_recorded(cache_dir):
+    result = RuthenianEngine(".").render_day(DAY)
+    deps = result["dependencies"]
+    assert ("file", "02b_06_february.json", "days/05") in deps
+    assert ("file", "02b_06_february.json", "days/06") not in deps
+    assert ("structure", "01i_struct_matins.json", "great_matins") in deps
+    assert all(("text", key) in deps for key in result["ir"].text_ids())
+
+def test_second_render_hits(cache_dir):
+    engine = RuthenianEngine(".", booklet_cache=cache_dir)
+    first = engine.render_day(DAY)
+    second = RuthenianEngine(".", booklet_cache=cache_dir).render_day(DAY)
+    assert second["booklet"] == first["booklet"]
+    assert second["dependencies"] == first["dependencies"]
+    assert engine.booklet_cache.misses == 1
+
+def test_only_used_inputs_invalidate(cache_dir):
+    engine = RuthenianEngine(".", booklet_cache=cache_dir)
+    used = engine.render_day(DAY)["ir"].text_ids()[0]
+
+    engine.text_db["octoechos.unused.test_key"] = {"title": "x", "content": "y"}
+    engine.render_day(DAY)
+    assert engine.booklet_cache.hits == 1
+
+    engine.text_db[used] = {"title": "Edited", "content": "edited text"}
+    result = engine.render_day(DAY)
+    assert engine.booklet_cache.misses == 2
+    assert "edited text" in result["booklet"]
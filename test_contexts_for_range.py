@@ -0,0 +1,31 @@
+from datetime import date, timedelta
+import pytest
+from liturgical_calendar import LiturgicalCalendar, contexts_for_range
+from ruthenian_engine import RuthenianEngine
+
+np = pytest.importorskip("numpy")
+
+def test_columns_match_per_day_contexts():
+    calendar = LiturgicalCalendar()
+    start, end = date(1999, 12, 1), date(2002, 6, 30)
+    cols = contexts_for_range(start, end, temple_feast_date=(8, 6))
+    assert len(cols) == (end - start).days + 1
+    for i, ctx in enumerate(cols):
+        day = start + timedelta(days=i)
+        assert ctx == calendar.context(day, (8, 6))
+        row = calendar.row(day)
+        assert (int(cols.tone[i]), int(cols.eothinon[i])) == (row.tone, row.eothinon)
+
+def test_pascha_offsets_are_zero_on_pascha():
+    cols = contexts_for_range(date(1900, 1, 1), date(2100, 12, 31))
+    paschas = cols.dates[cols.pascha_offset == 0]
+    assert len(paschas) == 201
+    assert str(paschas[125]) == "2025-04-20"
+    assert np.all(cols.day_of_week[cols.pascha_offset == 0] == 0)
+
+def test_engine_contexts_feed_resolution():
+    engine = RuthenianEngine(".")
+    cols = engine.contexts_for_range(date(2025, 4, 18), date(2025, 4, 20))
+    assert cols.period_names() == ["holy_friday", "holy_saturday", "pascha"]
+    rubrics = engine.resolve_rubrics(cols.context(2))
+    assert rubrics == engine.resolve_rubrics(engine.get_liturgical_context(date(2025, 4, 20)))
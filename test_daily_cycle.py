@@ -0,0 +1,34 @@
+import os
+from datetime import date
+import pytest
+from ruthenian_engine import RuthenianEngine
+
+@pytest.fixture(scope="module")
+def engine():
+    return RuthenianEngine(".")
+
+def _service_headers(booklet):
+    return [line.split(" (")[0].strip("- ") for line in booklet.splitlines() if line.startswith("--- ")]
+
+def test_daily_cycle_is_declared_in_json_db(engine):
+    names = [service["name"] for service in engine.daily_cycle]
+    assert names == ["Vespers", "Compline", "Midnight Office", "Matins",
+                     "First Hour", "Third Hour", "Sixth Hour", "Ninth Hour", "Divine Liturgy"]
+    for service in engine.daily_cycle:
+        assert os.path.exists(os.path.join(engine.json_db, service["file"]))
+        assert engine._get_resolved_structure(service["file"], service["root"]), service
+
+def test_threaded_booklet_matches_serial_in_liturgical_order(engine):
+    for target in (date(2025, 1, 7), date(2025, 4, 18), date(2025, 4, 20), date(2025, 8, 6)):
+        context = engine.get_liturgical_context(target)
+        rubrics = engine.resolve_rubrics(context)
+        serial = engine.generate_full_booklet(context, rubrics, workers=1)
+        threaded = engine.generate_full_booklet(context, rubrics, workers=4)
+        assert threaded == serial
+        assert _service_headers(threaded) == [s["name"].upper() for s in engine.daily_cycle]
+
+def test_plan_applies_matins_override(engine):
+    context = engine.get_liturgical_context(date(2025, 4, 20))
+    rubrics = engine.resolve_rubrics(context)
+    plan = dict((s["name"], root) for s, root in engine._plan_daily_cycle(context, rubrics, ["matins"]))
+    assert plan == {"Matins": "bright_matins"}
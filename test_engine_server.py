@@ -0,0 +1,84 @@
+import http.client
+import json
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+import pytest
+from ruthenian_engine import RuthenianEngine
+from engine_server import EngineServer
+
+@pytest.fixture(scope="module", params=["thread", "process"])
+def server(request):
+    server = EngineServer(RuthenianEngine("."), port=0, workers=2, mode=request.param, prefetch=False)
+    server.serve_in_background()
+    yield server
+    server.shutdown()
+
+def get(server, path):
+    conn = http.client.HTTPConnection("127.0.0.1", server.port, timeout=30)
+    try:
+        conn.request("GET", path)
+        response = conn.getresponse()
+        return response.status, response.getheader("Content-Type"), response.read().decode("utf-8")
+    finally:
+        conn.close()
+
+def test_context_and_rubrics(server):
+    status, content_type, body = get(server, "/context/2025-04-20")
+    assert status == 200 and content_type == "application/json"
+    assert json.loads(body)["pascha_offset"] == 0
+    rubrics = json.loads(get(server, "/rubrics/2025-04-20")[2])["rubrics"]
+    engine = server.engine
+    assert rubrics == engine.resolve_rubrics(engine.get_liturgical_context(date(2025, 4, 20)))
+
+def test_booklet_service_and_role(server):
+    status, _, body = get(server, "/booklet/2025-08-15?service=vespers&role=cantor")
+    assert status == 200
+    assert "--- VESPERS" in body and "--- MATINS" not in body
+    assert "[CANTOR]:" in body and "[PRIEST]:" not in body
+    full = get(server, "/booklet/2025-08-15?service=vespers")[2]
+    assert "[PRIEST]:" in full
+    assert json.loads(get(server, "/booklet/2025-08-15?service=vespers&format=json")[2])["title"]
+
+def test_errors(server):
+    assert get(server, "/booklet/2025-02-30")[0] == 400
+    assert get(server, "/booklet/2025-08-15?format=pdf")[0] == 400
+    assert get(server, "/booklet/2025-08-15?role=bishop")[0] == 400
+    assert get(server, "/calendar/2025-08-15")[0] == 404
+
+def test_concurrent_requests(server):
+    paths = [f"/booklet/2025-05-{day:02d}?service=matins" for day in range(1, 13)]
+    with ThreadPoolExecutor(6) as pool:
+        bodies = list(pool.map(lambda path: get(server, path), paths))
+    assert [status for status, _, _ in bodies] == [200] * len(paths)
+    assert bodies[3][2].startswith("DATE: 2025-05-04")
+
+def test_repeated_booklet_is_served_from_cache(server):
+    misses = server.response_cache.misses
+    first = get(server, "/booklet/2025-06-01?service=vespers&role=cantor")[2]
+    assert get(server, "/booklet/2025-06-01?service=vespers&role=cantor")[2] == first
+    assert server.response_cache.misses == misses + 1
+    assert server.cache_key(date(2025, 6, 1), ["vespers"], "cantor") in server.response_cache
+
+def test_prefetch_warms_hot_dates():
+    server = EngineServer(RuthenianEngine("."), port=0, workers=2, mode="thread")
+    server.today = lambda: date(2025, 7, 20)
+    server.serve_in_background()
+    try:
+        assert server.prefetched.wait(60)
+        hot = server.hot_dates()
+        assert hot[:2] == [date(2025, 7, 20), date(2025, 7, 21)] and hot[-1] == date(2025, 8, 6)
+        misses = server.response_cache.misses
+        for day in (date(2025, 7, 23), date(2025, 8, 6)):
+            assert get(server, f"/booklet/{day}")[0] == 200
+        assert server.response_cache.misses == misses
+    finally:
+        server.shutdown()
+
+def test_response_cache_is_bounded():
+    from engine_server import ResponseCache
+    cache = ResponseCache(max_bytes=10)
+    cache.put("a", b"12345")
+    cache.put("b", b"12345")
+    cache.get("a")
+    cache.put("c", b"123")
+    assert "b" not in cache and "a" in cache and cache.size == 8
@@ -0,0 +1,44 @@
+import os
+import shutil
+import pytest
+from ruthenian_engine import RuthenianEngine
+
+@pytest.fixture
+def base_dir(tmp_path):
+    # Private copy of json_db so the tests can touch sources freely
+    shutil.copytree("json_db", tmp_path / "json_db", ignore=shutil.ignore_patterns("_compiled", "stamford_backup"))
+    return str(tmp_path)
+
+def test_snapshot_roundtrip(base_dir):
+    source = RuthenianEngine(base_dir=base_dir, use_snapshot=False)
+    path = source.compile_snapshot()
+    assert os.path.exists(path)
+
+    engine = RuthenianEngine(base_dir=base_dir)
+    assert any("Snapshot: loaded" in line for line in engine.trace_log)
+    assert engine.text_db == source.text_db
+    assert engine.menaion_logic == source.menaion_logic
+    assert engine.hours_structures == source.hours_structures
+    assert engine.general_menaion_db == source.general_menaion_db
+
+def test_snapshot_rebuilt_when_source_changes(base_dir):
+    RuthenianEngine(base_dir=base_dir, use_snapshot=False).compile_snapshot()
+    triodion = os.path.join(base_dir, "json_db", "02c_logic_triodion.json")
+    st = os.stat(triodion)
+    os.utime(triodion, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+
+    stale = RuthenianEngine(base_dir=base_dir)
+    assert any("Snapshot: compiled" in line for line in stale.trace_log)
+
+    fresh = RuthenianEngine(base_dir=base_dir)
+    assert any("Snapshot: loaded" in line for line in fresh.trace_log)
+
+def test_corrupt_snapshot_falls_back_to_json(base_dir):
+    path = RuthenianEngine(base_dir=base_dir, use_snapshot=False).compile_snapshot()
+    with open(path, "r+b") as f:
+        f.seek(-1, os.SEEK_END)
+        f.write(b"\x00")
+
+    engine = RuthenianEngine(base_dir=base_dir)
+    assert not any("Snapshot: loaded" in line for line in engine.trace_log)
+    assert engine.get_text("weekday.monday.troparion")
@@ -0,0 +1,26 @@
+import itertools
+from rule_compiler import OTHER, GeneralCaseIndex
+from ruthenian_engine import RuthenianEngine
+
+def test_table_matches_linear_scan():
+    engine = RuthenianEngine(".")
+    index = engine._general_case_index()
+    periods = ["normal", "forefeast", "feast", "afterfeast", "apodosis", "unknown"]
+    ranks = ["rank_vigil", "rank_polyeleos", "rank_doxology", "rank_simple_4", "rank_simple_6", "rank_simple", "x"]
+    for key in itertools.product(periods, range(8), ranks, ["lord", "theotokos", "unknown", None]):
+        assert index.lookup(*key) is index.scan(*key), key
+    assert engine._general_case_index() is index
+
+def test_unmentioned_values_share_one_class():
+    index = GeneralCaseIndex({
+        "//_comment": "skipped",
+        "no_triggers": {"id": "skip"},
+        "lord": {"id": "lord", "triggers": {"period": ["feast"], "type": ["lord"]}},
+        "sunday": {"id": "sunday", "triggers": {"day_of_week": [0]}},
+    })
+    assert index.lookup("feast", 3, "r", "lord")["id"] == "lord"
+    assert index.lookup("feast", 0, "r", "theotokos")["id"] == "sunday"
+    assert index.lookup("feast", 3, "r", "theotokos") is None
+    assert ("feast", OTHER, OTHER, "lord") in index.table
+    # unhashable inputs fall back to the scan
+    assert index.lookup("feast", [0], "r", "lord")["id"] == "lord"
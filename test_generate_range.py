@@ -0,0 +1,30 @@
+from datetime import date
+import pytest
+from ruthenian_engine import RuthenianEngine
+
+@pytest.fixture
+def engine():
+    engine = RuthenianEngine(".")
+    engine.daily_cycle = [
+        {"name": "Vespers", "file": "01h_struct_vespers.json", "type_key": "vespers_type", "root": "daily_vespers"},
+        {"name": "Matins", "file": "01i_struct_matins.json", "type_key": "matins_type", "root": "daily_matins"},
+    ]
+    return engine
+
+def test_range_yields_every_day_in_order(engine):
+    results = list(engine.generate_range(date(2025, 4, 14), date(2025, 4, 27), workers=3, chunksize=2))
+    assert [r["date"] for r in results] == [date(2025, 4, 14 + i) for i in range(14)]
+    pascha = results[6]
+    assert pascha["context"]["pascha_offset"] == 0
+    assert pascha["booklet"].startswith("DATE: 2025-04-20")
+
+def test_pool_matches_in_process_generation(engine):
+    serial = list(engine.generate_range(date(2025, 1, 1), date(2025, 1, 10), workers=1))
+    pooled = list(engine.generate_range(date(2025, 1, 1), date(2025, 1, 10), workers=2))
+    assert [r["booklet"] for r in serial] == [r["booklet"] for r in pooled]
+    assert [r["rubrics"] for r in serial] == [r["rubrics"] for r in pooled]
+
+def test_services_filter(engine):
+    result = next(engine.generate_range(date(2025, 1, 7), date(2025, 1, 7), services=["matins"]))
+    assert "--- MATINS" in result["booklet"]
+    assert "--- VESPERS" not in result["booklet"]
@@ -0,0 +1,44 @@
+from datetime import date, timedelta
+from liturgical_calendar import LiturgicalCalendar, compute_pascha
+from ruthenian_engine import RuthenianEngine
+
+def test_known_paschas():
+    assert compute_pascha(2024) == date(2024, 3, 31)
+    assert compute_pascha(2025) == date(2025, 4, 20)
+    assert compute_pascha(2026) == date(2026, 4, 5)
+
+def test_year_table_covers_every_day():
+    calendar = LiturgicalCalendar()
+    assert len(calendar.year(2024)) == 366
+    assert len(calendar.year(2025)) == 365
+    assert calendar.year(2025) is calendar.year(2025)
+
+def test_rows_match_context():
+    calendar = LiturgicalCalendar()
+    day = date(2025, 1, 1)
+    for row in calendar.year(2025):
+        assert row.date == day
+        context = calendar.context(day)
+        assert (row.pascha_offset, row.day_of_week, row.season_id, row.triodion_period) == (
+            context["pascha_offset"], context["day_of_week"], context["season_id"], context["triodion_period"])
+        assert row.day_of_week == (day.weekday() + 1) % 7
+        day += timedelta(days=1)
+
+def test_tone_and_eothinon():
+    calendar = LiturgicalCalendar()
+    assert calendar.row(date(2025, 4, 27)).tone == 1          # Thomas Sunday
+    assert calendar.row(date(2025, 4, 26)).tone == 8          # Bright Saturday
+    assert calendar.row(date(2025, 6, 15)).eothinon == 1      # All Saints
+    assert calendar.row(date(2025, 5, 4)).eothinon == 0       # Pentecostarion propers
+    # Before Pascha the tone cycle continues from the previous year's Thomas Sunday
+    assert calendar.row(date(2025, 1, 5)).tone == (((date(2025, 1, 5) - date(2024, 4, 7)).days // 7) % 8) + 1
+
+def test_engine_context_uses_shared_calendar():
+    engine = RuthenianEngine(".", temple_feast_date=(8, 6))
+    assert engine.calendar is LiturgicalCalendar.shared()
+    ctx = engine.get_liturgical_context(date(2025, 8, 6))
+    assert ctx["is_temple_feast"] is True
+    assert ctx["pascha_offset"] == (date(2025, 8, 6) - date(2025, 4, 20)).days
+    # Contexts are fresh dicts: the engine mutates them during resolution
+    ctx["triodion_key"] = "x"
+    assert "triodion_key" not in engine.get_liturgical_context(date(2025, 8, 6))
@@ -60,3 +60,14 @@ def test_ingestion():
 
 if __name__ == "__main__":
     test_ingestion()
+
+def test_general_menaion_fallback_is_memoized():
+    engine = RuthenianEngine(".")
+    first = engine.get_text("menaion.01_22.troparion", context={"saint_class": "Apostle", "st_name": "Timothy"})
+    assert "Holy apostle Timothy" in first["content"] and first["_source"] == "General Menaion (apostle)"
+    first["content"] = "edited"
+    again = engine.get_text("menaion.01_22.troparion", context={"saint_class": "Apostle", "st_name": "Timothy"})
+    assert "Holy apostle Timothy" in again["content"]
+    other = engine.get_text("menaion.06_30.troparion", context={"saint_class": "Apostle", "st_name": "Andrew"})
+    assert "Holy apostle Andrew" in other["content"]
+    assert "{{name}}" in engine.general_menaion_db["general.apostle.troparion"]["content"]
@@ -0,0 +1,39 @@
+import json
+import os
+import shutil
+from datetime import date, timedelta
+import pytest
+from ruthenian_engine import RuthenianEngine
+
+@pytest.fixture
+def engine(tmp_path):
+    shutil.copytree("json_db", tmp_path / "json_db", ignore=shutil.ignore_patterns("_compiled"))
+    engine = RuthenianEngine(str(tmp_path))
+    for i in range(60):
+        engine.render_day(date(2025, 10, 15) + timedelta(days=i))
+    return engine
+
+def edit_json(path, edit):
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    edit(data)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+
+def test_menaion_day_edit_regenerates_one_day(engine):
+    path = os.path.join(engine.json_db, "02b_03_november.json")
+    edit_json(path, lambda d: d["month_settings"]["days"]["08"].update(title_key="menaion.nov_08.edited"))
+    results = engine.regenerate_affected([path])
+    assert [r["date"] for r in results] == [date(2025, 11, 8)]
+    assert results[0]["rubrics"]["title"] == "menaion.nov_08.edited"
+
+def test_text_edit_regenerates_days_using_the_key(engine):
+    path = os.path.join(engine.json_db, "stamford", "text_horologion.json")
+    edit_json(path, lambda d: d["horologion.psalm_103"].update(content="Edited psalm"))
+    results = engine.regenerate_affected(["stamford/text_horologion.json"])
+    users = [day for day, digests in engine.day_dependencies.items() if ("text", "horologion.psalm_103") in digests]
+    assert len(results) == len(users) > 0
+    assert all("Edited psalm" in r["booklet"] for r in results)
+
+def test_unchanged_file_regenerates_nothing(engine):
+    assert engine.regenerate_affected(["02c_logic_triodion.json"]) == []
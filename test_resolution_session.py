@@ -0,0 +1,41 @@
+from datetime import date
+import pytest
+from ruthenian_engine import RuthenianEngine
+
+@pytest.fixture(scope="module")
+def engine():
+    return RuthenianEngine(".")
+
+GATES = ("resolve_graduals", "check_magnificat_suppression", "resolve_vespers_stichera",
+         "resolve_canon_stack", "resolve_praises_stack", "resolve_antiphon_type", "identify_scenario")
+
+def test_each_fact_computed_once_per_session(engine):
+    context = engine.get_liturgical_context(date(2025, 8, 6))
+    with engine.resolution_session(context) as session:
+        engine.resolve_rubrics(context)
+        for gate in GATES:
+            getattr(engine, gate)(context)
+        engine.check_collision(context)
+        with engine.resolution_session(context) as nested:
+            assert nested is session
+    assert set(session.computed) >= {"rank", "rank_id", "paradigm", "general_case", "collision"}
+    assert all(count == 1 for count in session.computed.values()), session.computed
+    assert session.key == ("2025-08-06", False, engine.version_id)
+
+def test_session_results_match_transient(engine):
+    context = engine.get_liturgical_context(date(2025, 3, 25))
+    expected = [getattr(engine, gate)(dict(context)) for gate in GATES]
+    with engine.resolution_session(context):
+        assert [getattr(engine, gate)(context) for gate in GATES] == expected
+
+def test_no_caching_outside_a_session(engine):
+    context = {"date": "2025-01-07", "day_of_week": 2, "rank": 4}
+    assert engine.calculate_rank(context) == 4
+    context["rank"] = 1
+    assert engine.calculate_rank(context) == 1
+    assert engine.identify_paradigm(context) == "p_feast_lord"
+    assert engine._sessions == {}
+
+def test_render_day_closes_its_session(engine):
+    engine.render_day(date(2025, 1, 6), services=["vespers"])
+    assert engine._sessions == {}
@@ -0,0 +1,90 @@
+import itertools
+import pytest
+from rule_compiler import ConditionCache, ExpressionError, check_condition, compile_condition, compile_expression
+from ruthenian_engine import RuthenianEngine
+
+CONDITIONS = [
+    None, {},
+    {"season_id": "triodion"},
+    {"day_of_week": 0}, {"day_of_week": [1, 2, 3, 4, 5]},
+    {"triodion_period": "lent_weekday"}, {"triodion_period": ["pascha", "bright_week"]},
+    {"exclude_days": ["wed_veneration_cross"]}, {"exclude_days": "sunday_orthodoxy"},
+    {"pascha_offset": -7}, {"pascha_offset": [-36, -29]},
+    {"pascha_offset_range": [-6, -4]},
+    {"week": [3, 4]},
+    {"season_id": "triodion", "day_of_week": [6], "week": [2, 3, 4], "exclude_days": ["saturday_lent_2_3_4"]},
+]
+
+def _contexts():
+    for offset, dow, key in itertools.product(range(-60, 20, 3), range(7), ["", "wed_veneration_cross", "sunday"]):
+        yield {"pascha_offset": offset, "day_of_week": dow, "triodion_key": key,
+               "season_id": "triodion" if -70 <= offset < 0 else "pentecostarion",
+               "triodion_period": "lent_weekday" if -48 <= offset <= -1 else "bright_week"}
+
+def test_compiled_predicates_agree_with_interpreter():
+    for condition in CONDITIONS:
+        predicate = compile_condition(condition)
+        for context in _contexts():
+            assert predicate(context) == check_condition(condition, context), (condition, context)
+
+def test_logic_file_conditions_agree_with_interpreter():
+    engine = RuthenianEngine(".")
+    conditions = [rule["triggers"] for rule in engine.triodion_logic["logic_map"].values() if "triggers" in rule]
+    conditions += [rule.get("condition") for rule in engine.vespers_logic.get("kathisma_schedule", [])]
+    for condition in conditions:
+        predicate = compile_condition(condition)
+        for context in _contexts():
+            assert predicate(context) == check_condition(condition, context), condition
+
+def test_missing_context_key_still_raises():
+    with pytest.raises(KeyError):
+        compile_condition({"pascha_offset": 3})({"day_of_week": 0})
+
+def test_cache_compiles_each_condition_once():
+    cache = ConditionCache()
+    condition = {"day_of_week": [0, 6]}
+    assert cache.predicate(condition) is cache.predicate(condition)
+    assert cache.predicate(dict(condition)) is not cache.predicate(condition)
+    assert len(cache) == 2
+
+def test_expression_rank_compares_by_solemnity():
+    polyeleos = compile_expression("rank >= 3")
+    assert [polyeleos({"rank": r}) for r in range(1, 6)] == [True, True, True, False, False]
+    assert compile_expression("rank == 1")({"rank": 1})
+    assert compile_expression("day_of_week != 0 && rank >= 3")({"day_of_week": 3, "rank": 2})
+    assert not compile_expression("day_of_week == 0 && rank >= 3")({"day_of_week": 3, "rank": 2})
+
+def test_expression_rank_missing_or_mistyped_is_false():
+    polyeleos = compile_expression("rank >= 3")
+    assert polyeleos({}) is False
+    assert polyeleos({"rank": None}) is False
+    assert polyeleos({"rank": "3"}) is False
+    assert compile_expression("date in feasts")({"date": "12-25"}) is False
+
+def test_expression_language():
+    assert compile_expression("not is_afterfeast")({})
+    assert not compile_expression("temple_type != 'theotokos'")({"temple_type": "theotokos"})
+    assert compile_expression("default")({})
+    trisagion = compile_expression(
+        "date in ['01-06', '12-25'] or context.get('is_pentecost') or "
+        "context.get('is_palm_sunday') is False and context.get('is_lazarus_saturday')")
+    assert trisagion({"date": "12-25", "context": {}})
+    assert trisagion({"date": "04-12", "context": {"is_palm_sunday": False, "is_lazarus_saturday": True}})
+    assert not trisagion({"date": "04-12", "context": {"is_lazarus_saturday": True}})
+    assert compile_expression("rank >= 3") is compile_expression("rank >= 3")
+
+def test_expression_rejects_arbitrary_code():
+    for text in ("__import__('os').system('true')", "context.items()", "rank >= (", "x.y"):
+        with pytest.raises(ExpressionError):
+            compile_expression(text)
+
+def test_logic_file_rule_strings_compile():
+    engine = RuthenianEngine(".")
+    rules = engine.vespers_logic["entrance_triggers"]["rules"] + engine.matins_logic["sat_matins_lookahead"]["rules"]
+    rules += [rule for rules in engine.matins_logic["hymn_stacking"].values() for rule in rules]
+    rules += engine.liturgy_logic["antiphon_logic"] + engine.liturgy_logic["trisagion_logic"]
+    for rule in rules:
+        compile_expression(rule["condition"])
+    saturday = {"day_of_week": 6, "rank": 4, "date": "2025-03-01"}
+    assert engine.resolve_entrance_logic(saturday, {"variables": {}}) is True
+    assert engine.resolve_entrance_logic(dict(saturday, day_of_week=2), {"variables": {}}) is False
@@ -0,0 +1,93 @@
+import json
+import os
+from datetime import date
+import pytest
+from ruthenian_engine import RuthenianEngine
+from service_ir import BookletIR, Note, SlotIR, TextRef, logic_items
+
+@pytest.fixture(scope="module")
+def engine():
+    return RuthenianEngine(".")
+
+@pytest.fixture(scope="module")
+def day(engine):
+    context = engine.get_liturgical_context(date(2025, 8, 15))
+    rubrics = engine.resolve_rubrics(context)
+    return context, rubrics, engine.build_service_ir(context, rubrics)
+
+def test_text_render_matches_booklet(engine, day):
+    context, rubrics, ir = day
+    assert engine.render_service_ir(ir) == engine.generate_full_booklet(context, rubrics)
+    assert [s.name for s in ir.services] == [s["name"] for s in engine.daily_cycle]
+
+def test_ir_round_trips_through_json(engine, day):
+    ir = day[2]
+    copy = BookletIR.from_dict(json.loads(json.dumps(ir.to_dict())))
+    assert engine.render_service_ir(copy) == engine.render_service_ir(ir)
+    assert copy.text_ids() == ir.text_ids()
+
+def test_other_formats(engine, day):
+    ir = day[2]
+    markdown = engine.render_service_ir(ir, "markdown")
+    assert markdown.startswith(f"# {ir.title}") and "\n## Vespers (`" in markdown
+
+    data = json.loads(engine.render_service_ir(ir, "json"))
+    fixed = [slot for service in data["services"] for slot in service["slots"] if slot["kind"] == "fixed_ref"]
+    assert any(slot["texts"][0] for slot in fixed)
+
+    cantor = engine.render_service_ir(ir, "cantor", roles={"cantor"})
+    assert "[CANTOR]:" in cantor and "[PRIEST]:" not in cantor
+    with pytest.raises(ValueError):
+        engine.render_service_ir(ir, "pdf")
+
+def test_logic_items():
+    items = logic_items({"type": "stack", "components": ["a.b", {"ref_key": "c.d"}]}, "fn")
+    assert isinstance(items[0], Note) and items[0].text == "=> stack"
+    assert [(i.key, i.requirement, i.depth) for i in items[1:]] == [("a.b", None, 1), ("c.d", "fn", 1)]
+    assert all(isinstance(i, TextRef) for i in items[1:])
+
+def test_slot_without_context_is_listed_only(engine):
+    slot = {"id": "x", "content": {"type": "variable_logic", "logic": {"function": "resolve_trisagion_type"}}}
+    node = engine._slot_ir(slot, {})
+    assert isinstance(node, SlotIR) and node.items == () and node.logic == ("resolve_trisagion_type", "{}")
+
+def test_parallel_recensions_share_one_resolution(engine, tmp_path, monkeypatch):
+    (tmp_path / "psalm.json").write_text(json.dumps(
+        {"id": "horologion.psalm_103", "title": "Psalm 103 (Fixed)", "content": "Fixed recension psalm"}))
+    calls = []
+    resolve = engine.resolve_rubrics
+    monkeypatch.setattr(engine, "resolve_rubrics", lambda context: calls.append(context) or resolve(context))
+
+    context = engine.get_liturgical_context(date(2025, 8, 15))
+    out = engine.generate_parallel(context, ["stamford", {"label": "fixed", "fixed_recension_path": str(tmp_path)}],
+                                   services=["vespers"], width=120)
+    assert len(calls) == 1
+    row = next(line for line in out.splitlines() if "Psalm 103 (Fixed)" in line)
+    assert row.split(" | ")[0].strip() == ">>> Psalm 103 <<<"
+    assert "Fixed recension psalm" in out
+    # Shared rubric slots are printed once, full width
+    assert "[vesting_rite] " in out.splitlines()
+    with pytest.raises(ValueError):
+        engine.generate_parallel(context, ["stamford"], fmt="json")
+
+def test_parallel_columns_show_recension_differences(tmp_path):
+    # A base_dir sharing this json_db, plus an "other" recension with its own Psalm 103
+    (tmp_path / "json_db" / "other").mkdir(parents=True)
+    for entry in os.listdir("json_db"):
+        if entry != "_compiled":
+            (tmp_path / "json_db" / entry).symlink_to(os.path.abspath(os.path.join("json_db", entry)))
+    (tmp_path / "json_db" / "other" / "text_horologion.json").write_text(json.dumps(
+        {"horologion.psalm_103": {"title": "Psalm 103 (Other)", "content": "Other recension psalm"}}))
+
+    outputs = []
+    for version in ("stamford", "other"):
+        engine = RuthenianEngine(str(tmp_path), version=version, use_snapshot=False)
+        context = engine.get_liturgical_context(date(2025, 8, 15))
+        out = engine.generate_parallel(context, ["stamford", "other"], services=["vespers"], width=120)
+        row = next(line for line in out.splitlines() if "Psalm 103 (Other)" in line)
+        left, right = (column.strip() for column in row.split(" | "))
+        assert left == ">>> Psalm 103 <<<" and right == ">>> Psalm 103 (Other) <<<"
+        assert "Other recension psalm" in out
+        outputs.append(out)
+    # Either engine renders the same columns for the same recensions
+    assert outputs[0] == outputs[1]
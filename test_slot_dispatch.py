@@ -0,0 +1,39 @@
+from datetime import date
+import pytest
+from ruthenian_engine import RuthenianEngine
+
+@pytest.fixture(scope="module")
+def engine():
+    return RuthenianEngine(".")
+
+def test_dispatch_table_built_once_per_structure(engine):
+    resolvers = engine._get_slot_resolvers("01j_struct_liturgy.json", "liturgy_chrysostom")
+    skeleton = engine._get_resolved_structure("01j_struct_liturgy.json", "liturgy_chrysostom")
+    assert len(resolvers) == len(skeleton)
+    assert engine._get_slot_resolvers("01j_struct_liturgy.json", "liturgy_chrysostom") is resolvers
+    bound = {r.func_name for r in resolvers if r is not None}
+    assert "resolve_trisagion_type" in bound
+
+def test_variable_logic_uses_real_context(engine):
+    theophany = engine.get_liturgical_context(date(2025, 1, 6))
+    slot = {"id": "trisagion", "content": {"type": "variable_logic", "logic": {"function": "resolve_trisagion_type"}}}
+    text = engine._resolve_slot(slot, engine.resolve_rubrics(theophany), theophany)
+    assert "Logic: resolve_trisagion_type" in text
+    assert "baptismal_trisagion" in text
+
+def test_only_declared_args_are_forwarded(engine):
+    context = engine.get_liturgical_context(date(2025, 4, 18))
+    rubrics = engine.resolve_rubrics(context)
+    royal = engine._bind_resolver({"function": "resolve_royal_psalms", "args": {"hour": 3, "unknown": 1}})
+    assert royal(context, rubrics, None) == engine.resolve_royal_psalms(context, rubrics, hour=3)
+    assert engine._bind_resolver({"function": "resolve_does_not_exist"}) is None
+
+def test_resolver_errors_are_logged_not_raised(engine):
+    slot = {"id": "x", "content": {"type": "variable_logic", "logic": {"function": "resolve_communion_hymn"}}}
+    text = engine._resolve_slot(slot, {}, {"date": "2025-01-01"})
+    assert "Unresolved" in text
+    assert any("resolve_communion_hymn failed" in line for line in engine.trace_log)
+
+def test_without_context_slots_are_only_listed(engine):
+    slot = {"id": "x", "content": {"type": "variable_logic", "logic": {"function": "resolve_trisagion_type"}}}
+    assert engine._resolve_slot(slot, {}) == "   Logic: resolve_trisagion_type (Args: {})"
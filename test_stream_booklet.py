@@ -0,0 +1,56 @@
+import io
+import socket
+import threading
+from datetime import date
+import pytest
+from ruthenian_engine import RuthenianEngine
+
+@pytest.fixture(scope="module")
+def engine():
+    return RuthenianEngine(".")
+
+@pytest.fixture(scope="module")
+def day(engine):
+    context = engine.get_liturgical_context(date(2025, 4, 19))
+    return context, engine.resolve_rubrics(context)
+
+def test_chunks_join_to_full_booklet(engine, day):
+    context, rubrics = day
+    assert "\n".join(engine.iter_booklet(context, rubrics)) == engine.generate_full_booklet(context, rubrics)
+    matins = "\n".join(engine.iter_booklet(context, rubrics, services=["matins"]))
+    assert matins == engine.generate_full_booklet(context, rubrics, services=["matins"])
+
+def test_generator_is_lazy(engine, day):
+    context, rubrics = day
+    chunks = engine.iter_booklet(context, rubrics)
+    assert next(chunks).startswith("DATE: 2025-04-19")
+    assert next(chunks).startswith("\n--- VESPERS")
+    assert id(context) in engine._sessions
+    chunks.close()
+    assert engine._sessions == {}
+
+def test_write_to_text_binary_and_path(engine, day, tmp_path):
+    context, rubrics = day
+    expected = engine.generate_full_booklet(context, rubrics)
+    text = io.StringIO()
+    assert engine.write_booklet(context, rubrics, text) == len(expected)
+    assert text.getvalue() == expected
+    raw = io.BytesIO()
+    engine.write_booklet(context, rubrics, raw)
+    assert raw.getvalue().decode("utf-8") == expected
+    path = tmp_path / "booklet.txt"
+    engine.write_booklet(context, rubrics, str(path))
+    assert path.read_text(encoding="utf-8") == expected
+
+def test_write_to_socket(engine, day):
+    context, rubrics = day
+    expected = engine.generate_full_booklet(context, rubrics)
+    left, right = socket.socketpair()
+    received = []
+    reader = threading.Thread(target=lambda: received.append(right.makefile("rb").read()))
+    reader.start()
+    engine.write_booklet(context, rubrics, left)
+    left.shutdown(socket.SHUT_WR)
+    reader.join(5)
+    left.close(); right.close()
+    assert received[0].decode("utf-8") == expected
@@ -0,0 +1,35 @@
+import glob
+import os
+import pytest
+from ruthenian_engine import RuthenianEngine
+
+@pytest.fixture(scope="module")
+def engine():
+    return RuthenianEngine(".")
+
+def test_flattened_structures_match_inheritance_walk(engine):
+    for path in sorted(glob.glob(os.path.join("json_db", "01*_struct_*.json"))):
+        filename = os.path.basename(path)
+        struct_data = engine._load_json(filename)
+        for root_id in struct_data.get("structures", {}):
+            resolved = engine._get_resolved_structure(filename, root_id)
+            assert list(resolved) == engine._get_structure_sequence(struct_data, root_id), (filename, root_id)
+
+def test_structure_is_cached_and_read_only(engine):
+    first = engine._get_resolved_structure("01i_struct_matins.json", "lenten_matins_weekday")
+    assert engine._get_resolved_structure("01i_struct_matins.json", "lenten_matins_weekday") is first
+    with pytest.raises(TypeError):
+        first[0]["id"] = "changed"
+    with pytest.raises(TypeError):
+        first[0].setdefault("rubric", {})
+
+def test_overrides_applied_at_build_time(engine):
+    # presanctified_vespers inherits from lenten_vespers with overrides
+    struct_data = engine._load_json("01h_struct_vespers.json")
+    child = struct_data["structures"]["presanctified_vespers"]
+    parent_ids = [s.get("id") for s in engine._get_resolved_structure("01h_struct_vespers.json", child["inherits_from"])]
+    child_ids = [s.get("id") for s in engine._get_resolved_structure("01h_struct_vespers.json", "presanctified_vespers")]
+    assert child_ids != parent_ids
+
+def test_missing_structure(engine):
+    assert engine._get_resolved_structure("01h_struct_vespers.json", "no_such_root") is None
@@ -0,0 +1,153 @@
+import json
+import os
+import shutil
+import pytest
+from text_store import LayeredTextDB, LazyTextDB, build_alias_index, build_text_index, read_text_entry
+from ruthenian_engine import RuthenianEngine
+
+@pytest.fixture
+def bulk_file(tmp_path):
+    data = {
+        "tone_1.sat_vespers.troparia": {"title": "Troparion", "content": "O Lord, glory to You!"},
+        "menaion.jan_06.troparion": {"title": "Богоявленіе", "content": "When You were baptized in the Jordan…"},
+        "count": 3
+    }
+    path = tmp_path / "text_sample.json"
+    path.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+    return str(path), data
+
+def test_index_offsets_decode_each_entry(bulk_file):
+    path, data = bulk_file
+    index = build_text_index(path)
+    assert set(index) == set(data)
+    for key, (start, end) in index.items():
+        assert read_text_entry(path, start, end) == data[key]
+
+def test_lazy_db_decodes_on_first_access(bulk_file):
+    path, data = bulk_file
+    db = LazyTextDB()
+    db.add_file(path)
+    assert len(db) == 3 and db.decoded_count() == 0
+    assert "menaion.jan_06.troparion" in db
+    assert db.decoded_count() == 0
+    assert db["menaion.jan_06.troparion"]["title"] == "Богоявленіе"
+    assert db.decoded_count() == 1
+    assert db.get("missing") is None
+
+def test_later_sources_override(bulk_file, tmp_path):
+    path, _ = bulk_file
+    db = LazyTextDB()
+    db["count"] = 1
+    db.add_file(path)
+    assert db["count"] == 3
+    override = tmp_path / "override.json"
+    override.write_text(json.dumps({"count": 7}), encoding="utf-8")
+    db.add_file(str(override))
+    assert db["count"] == 7
+    db["count"] = 9
+    assert db["count"] == 9 and len(db) == 3
+
+def test_engine_text_db_is_lazy(tmp_path):
+    # Private copy of json_db: text layers are shared by engines reading the same files
+    shutil.copytree("json_db", tmp_path / "json_db", ignore=shutil.ignore_patterns("_compiled", "stamford_backup"))
+    engine = RuthenianEngine(str(tmp_path), use_snapshot=False)
+    assert engine.text_db.decoded_count() == 0
+    assert engine.get_text("weekday.monday.troparion")
+    assert engine.text_db.decoded_count() == 1
+
+def test_layers_resolve_without_copying(bulk_file):
+    path, data = bulk_file
+    base = LazyTextDB()
+    base.add_file(path)
+    fixed = {"count": 5}
+    db = LayeredTextDB([("base", base), ("fixed", fixed)])
+    assert db["count"] == 5 and db["menaion.jan_06.troparion"] == data["menaion.jan_06.troparion"]
+    db["count"] = 9
+    del db["tone_1.sat_vespers.troparia"]
+    assert db["count"] == 9 and "tone_1.sat_vespers.troparia" not in db and len(db) == 2
+    # Writes land in the view's private layer only
+    assert base["count"] == 3 and fixed == {"count": 5} and "tone_1.sat_vespers.troparia" in base
+    assert db.with_layers(fixed=None)["count"] == 9
+
+def test_engines_share_layers_and_switch_recension(tmp_path):
+    fixed = tmp_path / "fixed"
+    fixed.mkdir()
+    (fixed / "monday.json").write_text(json.dumps(
+        {"id": "weekday.monday.troparion", "title": "Fixed", "content": "Fixed recension text"}))
+    first, second = RuthenianEngine("."), RuthenianEngine(".")
+    assert first.text_base is second.text_base
+
+    first.text_db["weekday.monday.troparion"] = {"title": "Local", "content": "edited"}
+    assert second.get_text("weekday.monday.troparion")["content"] != "edited"
+
+    with second.recension(fixed_recension_path=str(fixed)) as view:
+        assert second.get_text("weekday.monday.troparion")["content"] == "Fixed recension text"
+        assert view.layer("base") is second.text_base
+    assert second.get_text("weekday.monday.troparion")["content"] != "Fixed recension text"
+
+def recension_tree(tmp_path):
+    """A base_dir sharing this json_db, plus an "other" recension with its own Psalm 103."""
+    (tmp_path / "json_db" / "other").mkdir(parents=True)
+    for entry in os.listdir("json_db"):
+        if entry != "_compiled":
+            (tmp_path / "json_db" / entry).symlink_to(os.path.abspath(os.path.join("json_db", entry)))
+    (tmp_path / "json_db" / "other" / "text_horologion.json").write_text(json.dumps(
+        {"horologion.psalm_103": {"title": "Psalm 103 (Other)", "content": "Other recension psalm"}}))
+    return str(tmp_path)
+
+def test_recension_layers_do_not_depend_on_engine_version(tmp_path):
+    base_dir = recension_tree(tmp_path)
+    stamford = RuthenianEngine(base_dir, version="stamford", use_snapshot=False)
+    other = RuthenianEngine(base_dir, version="other", use_snapshot=False)
+    for version in ("stamford", "other"):
+        views = [engine.text_view(version) for engine in (stamford, other)]
+        assert views[0].describe() == views[1].describe()
+        assert views[0].layer("recension") is views[1].layer("recension")
+        assert set(views[0]) == set(views[1])
+    assert stamford.text_view("stamford").describe() == stamford.text_db.describe()
+    assert other.text_view("other").describe() == other.text_db.describe()
+    with stamford.recension("other"):
+        assert stamford.get_text("horologion.psalm_103")["content"] == "Other recension psalm"
+    assert stamford.get_text("horologion.psalm_103")["title"] == "Psalm 103"
+
+def test_missing_recension_raises():
+    engine = RuthenianEngine(".")
+    with pytest.raises(FileNotFoundError):
+        engine.text_view("other")
+
+def test_alias_index_skips_ambiguous_aliases():
+    registry = {"domains": {"octoechos": {"keys": {
+        "tone_1.sat_vespers.stichera_lord_i_call": {"aliases": ["stichera_resurrection", "tone_1_resurrection_stichera"]},
+        "tone_2.sat_vespers.stichera_lord_i_call": {"aliases": ["stichera_resurrection"]},
+        "tone_2.sat_vespers.stichera_aposticha": {},
+    }}}}
+    index, ambiguous = build_alias_index(registry)
+    assert index == {"tone_1_resurrection_stichera": "tone_1.sat_vespers.stichera_lord_i_call"}
+    assert ambiguous == ["stichera_resurrection"]
+
+def test_engine_resolves_registry_aliases():
+    engine = RuthenianEngine(".")
+    assert "lords_prayer" not in engine.text_db
+    assert engine.canonical_key("lords_prayer") == "horologion.our_father"
+    assert engine.get_text("lords_prayer") == engine.get_text("horologion.our_father") is not None
+    slot = {"id": "x", "content": {"type": "fixed_ref", "ref_key": "lords_prayer"}}
+    assert engine._slot_ir(slot, {}).refs == ("horologion.our_father",)
+
+def test_prefix_queries_follow_segments(bulk_file):
+    path, _ = bulk_file
+    base = LazyTextDB()
+    base.add_file(path)
+    db = LayeredTextDB([("base", base)])
+    db["tone_1.sat_vespers.aposticha"] = {"content": "private"}
+    db["tone_10.sat_vespers.troparia"] = {"content": "not tone 1"}
+    assert db.keys_under("tone_1") == ["tone_1.sat_vespers.aposticha", "tone_1.sat_vespers.troparia"]
+    assert db.keys_with_prefix("tone_1") == db.keys_under("tone_1") + ["tone_10.sat_vespers.troparia"]
+    del db["tone_1.sat_vespers.troparia"]
+    assert db.keys_under("tone_1.sat_vespers") == ["tone_1.sat_vespers.aposticha"]
+    assert base.keys_with_prefix("menaion.") == ["menaion.jan_06.troparion"]
+
+def test_engine_keys_under():
+    engine = RuthenianEngine(".")
+    keys = engine.keys_under("tone_5.sun_matins")
+    assert keys and all(key.startswith("tone_5.sun_matins.") for key in keys)
+    assert keys == sorted(key for key in engine.text_db if key.startswith("tone_5.sun_matins."))
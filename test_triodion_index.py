@@ -0,0 +1,44 @@
+import pytest
+from ruthenian_engine import RuthenianEngine
+
+@pytest.fixture(scope="module")
+def engine():
+    return RuthenianEngine(".")
+
+def _linear_scan(engine, context):
+    best_key, best_priority = None, -1
+    for key, data in engine.triodion_logic["logic_map"].items():
+        if "triggers" in data and engine._check_condition(data["triggers"], context):
+            if data.get("priority", 0) > best_priority:
+                best_priority, best_key = data.get("priority", 0), key
+    return best_key
+
+def _indexed(engine, context):
+    for key, data, matches in engine._triodion_candidates(context["pascha_offset"]):
+        if matches(context):
+            return key
+    return None
+
+def test_index_matches_linear_scan(engine):
+    for offset in range(-90, 90):
+        for dow in range(7):
+            season = "triodion" if -70 <= offset < 0 else "pentecostarion" if 0 <= offset <= 56 else "octoechos"
+            context = {"pascha_offset": offset, "day_of_week": dow, "season_id": season,
+                       "triodion_period": engine._get_triodion_period_name(offset)}
+            assert _indexed(engine, context) == _linear_scan(engine, context), (offset, dow)
+
+def test_candidates_are_bounded(engine):
+    # Only rules that can apply to Pascha itself (plus unbounded ones) are checked
+    keys = [key for key, _, _ in engine._triodion_candidates(0)]
+    assert len(keys) < len(engine.triodion_logic["logic_map"])
+    priorities = [engine.triodion_logic["logic_map"][k].get("priority", 0) for k in keys]
+    assert priorities == sorted(priorities, reverse=True)
+
+def test_index_follows_replaced_logic_map(engine):
+    original = engine.triodion_logic
+    try:
+        engine.triodion_logic = {"logic_map": {"only": {"priority": 1, "triggers": {"pascha_offset": 3}}}}
+        assert [k for k, _, _ in engine._triodion_candidates(3)] == ["only"]
+        assert engine._triodion_candidates(4) == ()
+    finally:
+        engine.triodion_logic = original
@@ -0,0 +1,556 @@
+import bisect
+import json
+import os
+import re
+import sqlite3
+import threading
+import weakref
+from collections.abc import Mapping, MutableMapping
+
+
+def build_text_index(path):
+    """
+    Scans a bulk text file ({ "key": {asset}, ... }) once and returns
+    {key: (start, end)} byte offsets of every top-level value.
+    The values are parsed to find their extent but are not kept.
+    Returns an empty index if the file is not a JSON object.
+    """
+    with open(path, 'rb') as f:
+        raw = f.read()
+    text = raw.decode('utf-8')
+    # json.dump's default ensure_ascii output: character and byte offsets coincide
+    is_ascii = len(raw) == len(text)
+
+    decoder = json.JSONDecoder()
+    ws = " \t\n\r"
+    n = len(text)
+
+    def skip(i):
+        while i < n and text[i] in ws:
+            i += 1
+        return i
+
+    idx = skip(0)
+    if idx >= n or text[idx] != "{":
+        return {}
+
+    spans = {}
+    idx = skip(idx + 1)
+    if idx < n and text[idx] == "}":
+        return spans
+    while idx < n:
+        if text[idx] != '"':
+            raise ValueError(f"Expected key at offset {idx} in {path}")
+        key, idx = json.decoder.scanstring(text, idx + 1)
+        idx = skip(idx)
+        if text[idx] != ":":
+            raise ValueError(f"Expected ':' at offset {idx} in {path}")
+        start = skip(idx + 1)
+        _, end = decoder.raw_decode(text, start)
+        spans[key] = (start, end)
+        idx = skip(end)
+        if idx < n and text[idx] == ",":
+            idx = skip(idx + 1)
+            continue
+        break
+
+    if is_ascii:
+        return spans
+
+    # Convert character offsets to byte offsets in a single forward pass
+    index = {}
+    char_pos = byte_pos = 0
+    for key, (start, end) in sorted(spans.items(), key=lambda kv: kv[1][0]):
+        byte_pos += len(text[char_pos:start].encode('utf-8'))
+        byte_start = byte_pos
+        byte_pos += len(text[start:end].encode('utf-8'))
+        char_pos = end
+        index[key] = (byte_start, byte_pos)
+    return index
+
+
+def prefix_range(sorted_keys, prefix):
+    """The keys of a sorted list that start with prefix: a bisect plus a scan of the k matches."""
+    start = end = bisect.bisect_left(sorted_keys, prefix)
+    while end < len(sorted_keys) and sorted_keys[end].startswith(prefix):
+        end += 1
+    return sorted_keys[start:end]
+
+
+def read_text_entry(path, start, end):
+    """Decodes a single indexed value from a bulk text file."""
+    with open(path, 'rb') as f:
+        f.seek(start)
+        return json.loads(f.read(end - start))
+
+
+class LazyTextDB(MutableMapping):
+    """
+    Dict-like text database backed by a key -> (file, start, end) index.
+    Entries are decoded on first access and then kept, so memory scales
+    with the keys a service actually touches.
+
+    Files (and packed AssetStores) added later override earlier ones
+    (same semantics as dict.update).
+    Assigned entries (e.g. single external assets) are held directly.
+    """
+
+    def __init__(self):
+        self._index = {}    # key -> (path, start, end) or (AssetStore, None, None)
+        self._entries = {}  # decoded (or directly assigned) entries
+        self._sorted = None  # sorted keys for prefix queries, rebuilt after keys are added or removed
+
+    def add_file(self, path, index=None):
+        """
+        Registers a bulk text file. `index` may be a prebuilt build_text_index() result.
+        Returns the number of keys indexed.
+        """
+        if index is None:
+            index = build_text_index(path)
+        for key, (start, end) in index.items():
+            self._index[key] = (path, start, end)
+            self._entries.pop(key, None)
+        self._sorted = None
+        return len(index)
+
+    def add_store(self, store):
+        """
+        Registers every ID of a packed AssetStore; rows are fetched by point lookup on first access.
+        Returns the number of keys registered.
+        """
+        count = 0
+        for key in store:
+            self._index[key] = (store, None, None)
+            self._entries.pop(key, None)
+            count += 1
+        self._sorted = None
+        return count
+
+    def stores(self):
+        """The AssetStores registered with add_store()."""
+        return list({id(source): source for source, _, _ in self._index.values() if not isinstance(source, str)}.values())
+
+    def keys_from(self, path):
+        """Keys currently indexed from the bulk file path."""
+        path = os.path.abspath(path)
+        return [key for key, (source, _, _) in self._index.items()
+                if isinstance(source, str) and os.path.abspath(source) == path]
+
+    def reload_file(self, path):
+        """
+        Re-indexes a bulk file after it changed on disk: keys it no longer contains are dropped,
+        the others are decoded afresh on next access. Returns the number of keys indexed.
+        """
+        index = build_text_index(path) if os.path.exists(path) else {}
+        for key in self.keys_from(path):
+            if key not in index:
+                del self._index[key]
+                self._entries.pop(key, None)
+        return self.add_file(path, index)
+
+    def keys_with_prefix(self, prefix):
+        """All keys starting with prefix, sorted (O(log n + k) on the sorted key index)."""
+        keys = self._sorted
+        if keys is None:
+            keys = self._sorted = sorted(self)
+        return prefix_range(keys, prefix)
+
+    def decoded_count(self):
+        """Number of entries currently held in memory."""
+        return len(self._entries)
+
+    def __getitem__(self, key):
+        try:
+            return self._entries[key]
+        except KeyError:
+            pass
+        source, start, end = self._index[key]
+        if isinstance(source, str):
+            value = read_text_entry(source, start, end)
+        else:
+            value = source[key]
+        self._entries[key] = value
+        return value
+
+    def __setitem__(self, key, value):
+        if key not in self:
+            self._sorted = None
+        self._index.pop(key, None)
+        self._entries[key] = value
+
+    def __delitem__(self, key):
+        found = self._index.pop(key, None) is not None
+        found = self._entries.pop(key, None) is not None or found
+        if not found:
+            raise KeyError(key)
+        self._sorted = None
+
+    def __contains__(self, key):
+        return key in self._entries or key in self._index
+
+    def __iter__(self):
+        yield from self._index
+        for key in self._entries:
+            if key not in self._index:
+                yield key
+
+    def __len__(self):
+        return len(self._index) + sum(1 for key in self._entries if key not in self._index)
+
+    def __getstate__(self):
+        # Indexed entries are re-read on demand; only assigned entries are persisted
+        own = {k: v for k, v in self._entries.items() if k not in self._index}
+        return {"index": self._index, "entries": own}
+
+    def __setstate__(self, state):
+        self._index = state["index"]
+        self._entries = state["entries"]
+        self._sorted = None
+
+
+def build_alias_index(registry):
+    """
+    {alias: canonical text ID} from a 00_master_key_registry.json document
+    (domains -> keys -> {canonical: {"aliases": [...]}}).
+    Aliases claimed by several canonical keys are left out. Returns (index, ambiguous aliases).
+    """
+    claims = {}
+    for domain in registry.get("domains", {}).values():
+        for canonical, entry in domain.get("keys", {}).items():
+            for alias in (entry or {}).get("aliases", ()):
+                if alias != canonical:
+                    claims.setdefault(alias, set()).add(canonical)
+    index = {alias: next(iter(keys)) for alias, keys in claims.items() if len(keys) == 1}
+    return index, sorted(alias for alias, keys in claims.items() if len(keys) > 1)
+
+
+# --- Layered Text Store ---
+
+# Lookup order, lowest priority first: later layers override earlier ones
+TEXT_LAYERS = ("base", "common", "recension", "fixed", "variable", "private")
+
+_DELETED = object()  # private-layer tombstone hiding a key of a lower layer
+
+_shared_layers = weakref.WeakValueDictionary()
+_shared_lock = threading.Lock()
+
+
+def source_signature(*paths):
+    """(path, mtime_ns, size) of every file under paths (directories are walked for .json files)."""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, names in os.walk(path):
+                dirs.sort()
+                files += [os.path.join(root, name) for name in sorted(names) if name.endswith(".json")]
+        else:
+            files.append(path)
+    signature = []
+    for path in files:
+        try:
+            st = os.stat(path)
+        except OSError:
+            signature.append((os.path.abspath(path), None, None))
+            continue
+        signature.append((os.path.abspath(path), st.st_mtime_ns, st.st_size))
+    return tuple(signature)
+
+
+def shared_layer(key, build):
+    """
+    Process-wide text layer registry: returns the live layer registered under key,
+    or registers build(). Layers are held weakly and live as long as some engine uses them.
+    Keys should include a source_signature() so that edited files get a fresh layer.
+    """
+    with _shared_lock:
+        layer = _shared_layers.get(key)
+        if layer is None:
+            layer = build()
+            _shared_layers[key] = layer
+        return layer
+
+
+class LayeredTextDB(MutableMapping):
+    """
+    Dict-like view resolving each key through a chain of text layers (see TEXT_LAYERS)
+    instead of merging them: the highest layer holding a key wins. Layers are never
+    copied or written to, so engines and recension views can share them; assignments
+    and deletions land in this view's own private layer (copy-on-write).
+
+    layers: (name, mapping[, label]) tuples, lowest priority first.
+    """
+
+    def __init__(self, layers=(), private=None):
+        self.layers = []
+        for layer in layers:
+            name, mapping, label = (tuple(layer) + (None,))[:3]
+            if mapping is not None:
+                self.layers.append((name, mapping, label))
+        self.private = {} if private is None else private
+        self._chain = tuple(mapping for _, mapping, _ in reversed(self.layers))
+
+    def layer(self, name):
+        """The mapping of a named layer, or None."""
+        for layer_name, mapping, _ in self.layers:
+            if layer_name == name:
+                return mapping
+        return None
+
+    def with_layers(self, **layers):
+        """
+        A new view sharing this one's layers and private layer, with the named layers
+        replaced (a (mapping, label) tuple or a mapping; None drops the layer).
+        """
+        chain = {name: (mapping, label) for name, mapping, label in self.layers}
+        for name, value in layers.items():
+            chain[name] = value if isinstance(value, tuple) or value is None else (value, None)
+        ordered = [(name,) + chain[name] for name in TEXT_LAYERS if chain.get(name)]
+        ordered += [(name,) + value for name, value in chain.items() if name not in TEXT_LAYERS and value]
+        return LayeredTextDB(ordered, self.private)
+
+    def describe(self):
+        """[(layer name, label)] from lowest to highest priority, e.g. for cache keys."""
+        return [(name, label) for name, _, label in self.layers]
+
+    def decoded_count(self):
+        """Number of entries held in memory across the layers."""
+        held = sum(mapping.decoded_count() for _, mapping, _ in self.layers if hasattr(mapping, "decoded_count"))
+        return held + sum(1 for value in self.private.values() if value is not _DELETED)
+
+    def keys_from(self, path):
+        """Keys indexed from the bulk file path in any layer."""
+        keys = []
+        for _, mapping, _ in self.layers:
+            if hasattr(mapping, "keys_from"):
+                keys += mapping.keys_from(path)
+        return keys
+
+    def reload_file(self, path):
+        """Re-indexes path in every layer that indexes it (see LazyTextDB.reload_file)."""
+        return sum(mapping.reload_file(path) for _, mapping, _ in self.layers
+                   if hasattr(mapping, "keys_from") and mapping.keys_from(path))
+
+    def keys_with_prefix(self, prefix):
+        """All keys starting with prefix, sorted; each layer answers from its own sorted key index."""
+        found = set()
+        for mapping in self._chain:
+            if hasattr(mapping, "keys_with_prefix"):
+                found.update(mapping.keys_with_prefix(prefix))
+            else:
+                found.update(key for key in mapping if key.startswith(prefix))
+        found.update(key for key in self.private if key.startswith(prefix))
+        return sorted(key for key in found if self.private.get(key) is not _DELETED)
+
+    def keys_under(self, prefix):
+        """
+        Keys at or below a dotted prefix: keys_under("tone_5.sun_matins") finds
+        "tone_5.sun_matins.sessionals" but not "tone_5.sun_matins_extra". "" lists every key.
+        """
+        if not prefix:
+            return sorted(self)
+        return ([prefix] if prefix in self else []) + self.keys_with_prefix(prefix + ".")
+
+    def __getitem__(self, key):
+        try:
+            value = self.private[key]
+        except KeyError:
+            pass
+        else:
+            if value is _DELETED:
+                raise KeyError(key)
+            return value
+        for mapping in self._chain:
+            try:
+                return mapping[key]
+            except KeyError:
+                continue
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        self.private[key] = value
+
+    def __delitem__(self, key):
+        if key not in self:
+            raise KeyError(key)
+        if any(key in mapping for mapping in self._chain):
+            self.private[key] = _DELETED
+        else:
+            del self.private[key]
+
+    def __contains__(self, key):
+        if key in self.private:
+            return self.private[key] is not _DELETED
+        return any(key in mapping for mapping in self._chain)
+
+    def __iter__(self):
+        seen = set(self.private)
+        for key, value in self.private.items():
+            if value is not _DELETED:
+                yield key
+        for mapping in self._chain:
+            for key in mapping:
+                if key not in seen:
+                    seen.add(key)
+                    yield key
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __bool__(self):
+        return any(value is not _DELETED for value in self.private.values()) or any(len(m) for m in self._chain)
+
+
+# --- Packed Asset Store (SQLite) ---
+
+SERVICE_WORDS = ("vespers", "matins", "compline", "midnight", "hour", "typika", "liturgy", "nocturn", "vigil")
+TONE_PATTERN = re.compile(r"(?:^|[._])tone_(\d+)")
+
+
+def load_id_map(assets_base):
+    """Reads the hash -> logical ID map written by parsers/migrate_to_assets.py."""
+    id_map_path = os.path.join(assets_base, "_id_map.json")
+    if not os.path.exists(id_map_path):
+        return {}
+    with open(id_map_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def iter_asset_tree(assets_base, on_error=None):
+    """
+    Walks an assets/<recension>/ tree and yields (logical_id, book, asset_data).
+    The logical ID comes from '_original_id' or, failing that, the _id_map.json hash lookup.
+    """
+    id_map = load_id_map(assets_base)
+    for root, dirs, files in os.walk(assets_base):
+        dirs.sort()
+        for file in sorted(files):
+            if not file.endswith('.json') or file == '_id_map.json':
+                continue
+            asset_path = os.path.join(root, file)
+            try:
+                with open(asset_path, 'r', encoding='utf-8') as f:
+                    asset_data = json.load(f)
+            except Exception as e:
+                if on_error: on_error(asset_path, e)
+                continue
+
+            if isinstance(asset_data, dict) and '_original_id' in asset_data:
+                asset_id = asset_data['_original_id']
+            else:
+                file_hash = os.path.splitext(file)[0]
+                asset_id = id_map.get(file_hash, file_hash)
+
+            rel = os.path.relpath(root, assets_base)
+            book = rel.split(os.sep)[0] if rel != "." else None
+            yield asset_id, book, asset_data
+
+
+def classify_asset_id(asset_id):
+    """Derives the (tone, service) columns from a hierarchical logical ID."""
+    match = TONE_PATTERN.search(asset_id)
+    tone = int(match.group(1)) if match else None
+    service = None
+    for segment in asset_id.split(".")[1:]:
+        if any(word in segment for word in SERVICE_WORDS):
+            service = segment
+            break
+    return tone, service
+
+
+class AssetStore(Mapping):
+    """
+    A whole recension packed into one SQLite file (one row per logical ID).
+    Lookups are indexed point queries; prefix scans use the primary-key range.
+    """
+
+    SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS assets ("
+        " id TEXT PRIMARY KEY, book TEXT, tone INTEGER, service TEXT, data TEXT NOT NULL"
+        ") WITHOUT ROWID",
+        "CREATE INDEX IF NOT EXISTS idx_assets_book_tone ON assets (book, tone)",
+        "CREATE INDEX IF NOT EXISTS idx_assets_service ON assets (service)",
+    )
+
+    def __init__(self, path):
+        self.path = path
+        self._conn = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def pack(cls, assets_base, db_path, on_error=None):
+        """
+        Packs an assets/<recension>/ tree into db_path (replacing it).
+        Later files win on duplicate IDs, as with the directory walk. Returns the row count.
+        """
+        tmp_path = db_path + ".tmp"
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        conn = sqlite3.connect(tmp_path)
+        try:
+            for statement in cls.SCHEMA:
+                conn.execute(statement)
+            rows = []
+            for asset_id, book, asset_data in iter_asset_tree(assets_base, on_error):
+                tone, service = classify_asset_id(asset_id)
+                rows.append((asset_id, book, tone, service, json.dumps(asset_data, ensure_ascii=False)))
+            conn.executemany("INSERT OR REPLACE INTO assets VALUES (?, ?, ?, ?, ?)", rows)
+            conn.commit()
+            count = conn.execute("SELECT COUNT(*) FROM assets").fetchone()[0]
+        finally:
+            conn.close()
+        os.replace(tmp_path, db_path)
+        return count
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            # sqlite connections must not cross a fork: reopen in the child
+            if self._conn is None or self._pid != os.getpid():
+                self._conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, check_same_thread=False)
+                self._pid = os.getpid()
+            return self._conn.execute(sql, params).fetchall()
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None and self._pid == os.getpid():
+                self._conn.close()
+            self._conn = None
+
+    def __getitem__(self, asset_id):
+        rows = self._query("SELECT data FROM assets WHERE id = ?", (asset_id,))
+        if not rows:
+            raise KeyError(asset_id)
+        return json.loads(rows[0][0])
+
+    def __contains__(self, asset_id):
+        return bool(self._query("SELECT 1 FROM assets WHERE id = ?", (asset_id,)))
+
+    def __iter__(self):
+        return iter([row[0] for row in self._query("SELECT id FROM assets ORDER BY id")])
+
+    def __len__(self):
+        return self._query("SELECT COUNT(*) FROM assets")[0][0]
+
+    def keys_with_prefix(self, prefix):
+        """All IDs starting with prefix, via a primary-key range scan."""
+        if not prefix:
+            return list(self)
+        upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+        rows = self._query("SELECT id FROM assets WHERE id >= ? AND id < ? ORDER BY id", (prefix, upper))
+        return [row[0] for row in rows]
+
+    def select(self, book=None, tone=None, service=None):
+        """IDs filtered by the book / tone / service columns (None = any)."""
+        clauses, params = [], []
+        for column, value in (("book", book), ("tone", tone), ("service", service)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        return [row[0] for row in self._query(f"SELECT id FROM assets{where} ORDER BY id", params)]
+
+    def __getstate__(self):
+        return {"path": self.path}
+
+    def __setstate__(self, state):
+        self.__init__(state["path"])